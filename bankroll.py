@@ -0,0 +1,295 @@
+import argparse
+import math
+import os
+import sys
+import time
+
+from random_streams import FluxoAleatorio
+
+# Simulador de banca: sessões independentes que jogam rodada após rodada até
+# quebrar (iniciar_rodada recusa com menos de 2x ante; com menos de 3x o CALL é
+# recusado e a mão vira FOLD) ou até o limite de rodadas. As rodadas são
+# independentes (baralho novo a cada uma), então cada sessão é um passeio
+# aleatório sobre a distribuição exata do ganho por rodada: +2, 0, -3 ou -1
+# ante. Como as fichas só mudam em múltiplos do ante, o estado é o número de
+# antes da banca; bancas com o mesmo número de antes compartilham a simulação.
+# As estatísticas são acumuladas em streaming (Welford e histogramas), sem
+# guardar trajetórias.
+GANHOS = (2, 0, -3, -1)
+ANTES_PARA_JOGAR = 2
+ANTES_PARA_CALL = 3
+SESSOES_POR_TAREFA = 16384
+PERCENTIS = (10, 50, 90, 99)
+
+def distribuicao_ganhos(estrategia="otima", num_rodadas=1000000, semente=None):
+    # Probabilidades de cada ganho em GANHOS. Exatas pela tabela de estratégia;
+    # sem ela, estimadas com o SimuladorRodadas
+    from optimal_strategy import _peso_classe, carregar_tabela_estrategia
+    from preflop_table import NUM_CLASSES
+    
+    tabela = carregar_tabela_estrategia()
+    if tabela is not None:
+        probabilidades = [0.0] * 4
+        for i in range(NUM_CLASSES):
+            pagos, empates, perdidos, total = tabela._contagens[i]
+            peso = _peso_classe(i) / 1326
+            if estrategia == "sempre_call" or tabela._ev_call[i] > -1:
+                probabilidades[0] += peso * pagos / total
+                probabilidades[1] += peso * empates / total
+                probabilidades[2] += peso * perdidos / total
+            else:
+                probabilidades[3] += peso
+        return probabilidades
+    
+    from simulator import SimuladorRodadas, sempre_call
+    from optimal_strategy import estrategia_otima
+    funcao = sempre_call if estrategia == "sempre_call" else estrategia_otima
+    contagem = SimuladorRodadas(funcao, semente=semente).simular(num_rodadas)['resultados']
+    return [(contagem["NAO_QUALIFICOU"] + contagem["VITORIA"]) / num_rodadas, contagem["EMPATE"] / num_rodadas,
+            contagem["DERROTA"] / num_rodadas, contagem["FOLD"] / num_rodadas]
+
+def _adicionar(acumulador, valor):
+    # Welford: (n, média, soma dos quadrados dos desvios) atualizados um valor por vez
+    n, media, m2 = acumulador
+    n += 1
+    delta = valor - media
+    media += delta / n
+    return (n, media, m2 + delta * (valor - media))
+
+def _welford_numpy(valores):
+    # O mesmo acumulador para um bloco inteiro de sessões
+    n = int(valores.size)
+    if not n:
+        return (0, 0.0, 0.0)
+    media = float(valores.mean())
+    return (n, media, float(((valores - media) ** 2).sum()))
+
+def _combinar_welford(a, b):
+    # Fórmula de Chan para juntar dois acumuladores (blocos de workers diferentes)
+    n = a[0] + b[0]
+    if not n:
+        return (0, 0.0, 0.0)
+    delta = b[1] - a[1]
+    return (n, a[1] + delta * b[0] / n, a[2] + b[2] + delta * delta * a[0] * b[0] / n)
+
+def _resumo_welford(acumulador, escala=1):
+    n, media, m2 = acumulador
+    return {
+        'media': media * escala,
+        'desvio_padrao': math.sqrt(m2 / (n - 1)) * escala if n > 1 else 0.0,
+    }
+
+def _percentil(histograma, percentil):
+    total = sum(histograma)
+    alvo = total * percentil / 100
+    acumulado = 0
+    for valor, contagem in enumerate(histograma):
+        acumulado += contagem
+        if contagem and acumulado >= alvo:
+            return valor
+    return len(histograma) - 1
+
+def _simular_sessoes(unidades, max_rodadas, probabilidades, num_sessoes, rng):
+    # Caminho sem NumPy: uma sessão por vez, acumulando direto nos histogramas e
+    # nos acumuladores de Welford
+    limites = [sum(probabilidades[:i + 1]) for i in range(3)]
+    aleatorio = rng.random
+    duracoes = [0] * (max_rodadas + 1)
+    drawdowns = [0] * (ANTES_PARA_CALL * max_rodadas + 1)
+    finais = ruina = (0, 0.0, 0.0)
+    for _ in range(num_sessoes):
+        banca = pico = unidades
+        pior = 0
+        rodada = 0
+        while rodada < max_rodadas and banca >= ANTES_PARA_JOGAR:
+            if banca < ANTES_PARA_CALL:
+                banca -= 1
+            else:
+                sorteio = aleatorio()
+                banca += GANHOS[0 if sorteio < limites[0] else 1 if sorteio < limites[1] else
+                                2 if sorteio < limites[2] else 3]
+            rodada += 1
+            if banca > pico:
+                pico = banca
+            elif pico - banca > pior:
+                pior = pico - banca
+        duracoes[rodada] += 1
+        drawdowns[pior] += 1
+        finais = _adicionar(finais, banca)
+        if banca < ANTES_PARA_JOGAR:
+            ruina = _adicionar(ruina, rodada)
+    return duracoes, drawdowns, finais, ruina
+
+def _simular_sessoes_numpy(unidades, max_rodadas, probabilidades, num_sessoes, rng):
+    # Todas as sessões do bloco avançam juntas; as que quebram saem dos arrays
+    import numpy as np
+    
+    ganhos = np.array(GANHOS, dtype=np.int64)
+    acumuladas = np.cumsum(probabilidades[:3])
+    duracoes = np.full(num_sessoes, max_rodadas, dtype=np.int64)
+    drawdowns = np.zeros(num_sessoes, dtype=np.int64)
+    finais = np.zeros(num_sessoes, dtype=np.int64)
+    
+    indices = np.arange(num_sessoes)
+    banca = np.full(num_sessoes, unidades, dtype=np.int64)
+    pico = banca.copy()
+    pior = np.zeros(num_sessoes, dtype=np.int64)
+    for rodada in range(max_rodadas):
+        quebradas = banca < ANTES_PARA_JOGAR
+        if quebradas.any():
+            saindo = indices[quebradas]
+            duracoes[saindo] = rodada
+            drawdowns[saindo] = pior[quebradas]
+            finais[saindo] = banca[quebradas]
+            vivas = ~quebradas
+            indices, banca, pico, pior = indices[vivas], banca[vivas], pico[vivas], pior[vivas]
+            if not indices.size:
+                break
+        ganho = ganhos[np.searchsorted(acumuladas, rng.random(indices.size), side="right")]
+        ganho[banca < ANTES_PARA_CALL] = -1
+        banca += ganho
+        np.maximum(pico, banca, out=pico)
+        np.maximum(pior, pico - banca, out=pior)
+    drawdowns[indices] = pior
+    finais[indices] = banca
+    
+    ruina = finais < ANTES_PARA_JOGAR
+    return (np.bincount(duracoes, minlength=max_rodadas + 1).tolist(),
+            np.bincount(drawdowns, minlength=ANTES_PARA_CALL * max_rodadas + 1).tolist(),
+            finais, duracoes[ruina])
+
+def _simular_bloco(tarefa):
+    unidades, max_rodadas, probabilidades, num_sessoes, semente, indice, vetorizado = tarefa
+    # Cada bloco tem seu próprio fluxo, derivado de (semente, banca em antes, índice)
+    if vetorizado:
+        import numpy as np
+        duracoes, drawdowns, finais, duracoes_ruina = _simular_sessoes_numpy(
+            unidades, max_rodadas, probabilidades, num_sessoes, np.random.default_rng([semente, unidades, indice]))
+        return {
+            'duracoes': duracoes,
+            'drawdowns': drawdowns,
+            'finais': _welford_numpy(finais.astype(np.float64)),
+            'ruina': _welford_numpy(duracoes_ruina.astype(np.float64)),
+        }
+    duracoes, drawdowns, finais, ruina = _simular_sessoes(
+        unidades, max_rodadas, probabilidades, num_sessoes, FluxoAleatorio(semente, (unidades, indice)))
+    return {'duracoes': duracoes, 'drawdowns': drawdowns, 'finais': finais, 'ruina': ruina}
+
+def _somar_blocos(blocos):
+    total = {'duracoes': None, 'drawdowns': None, 'finais': (0, 0.0, 0.0), 'ruina': (0, 0.0, 0.0)}
+    for bloco in blocos:
+        for chave in ('duracoes', 'drawdowns'):
+            total[chave] = bloco[chave] if total[chave] is None else [a + b for a, b in zip(total[chave], bloco[chave])]
+        for chave in ('finais', 'ruina'):
+            total[chave] = _combinar_welford(total[chave], bloco[chave])
+    return total
+
+def _resumo_histograma(histograma, escala=1):
+    n = sum(histograma)
+    media = sum(valor * contagem for valor, contagem in enumerate(histograma)) / n
+    m2 = sum((valor - media) ** 2 * contagem for valor, contagem in enumerate(histograma) if contagem)
+    resumo = _resumo_welford((n, media, m2), escala)
+    for percentil in PERCENTIS:
+        resumo[f'p{percentil}'] = _percentil(histograma, percentil) * escala
+    return resumo
+
+def simular_bancas(fichas=(1000,), antes=(10,), num_sessoes=100000, max_rodadas=1000, estrategia="otima",
+                   semente=None, workers=None, vetorizado=None, sessoes_por_tarefa=SESSOES_POR_TAREFA):
+    # Grade fichas x antes: risco de ruína, duração das sessões e drawdown máximo
+    from parallel import dividir, semente_base
+    
+    if vetorizado is None:
+        try:
+            import numpy  # noqa: F401
+            vetorizado = True
+        except ImportError:
+            vetorizado = False
+    workers = workers or os.cpu_count() or 1
+    semente = semente_base(semente)
+    probabilidades = distribuicao_ganhos(estrategia, semente=semente)
+    
+    # Só o número de antes da banca importa: uma simulação por valor distinto
+    unidades = sorted({f // a for f in fichas for a in antes})
+    num_tarefas = max(1, -(-num_sessoes // sessoes_por_tarefa))
+    tarefas = [(u, max_rodadas, probabilidades, n, semente, i, vetorizado)
+               for u in unidades for i, n in enumerate(dividir(num_sessoes, num_tarefas)) if n]
+    inicio = time.perf_counter()
+    if workers > 1:
+        from parallel import mapear
+        blocos = mapear(_simular_bloco, tarefas, workers)
+    else:
+        blocos = [_simular_bloco(tarefa) for tarefa in tarefas]
+    segundos = time.perf_counter() - inicio
+    por_unidade = {u: _somar_blocos([b for t, b in zip(tarefas, blocos) if t[0] == u]) for u in unidades}
+    
+    configuracoes = []
+    for f in fichas:
+        for a in antes:
+            total = por_unidade[f // a]
+            ruinas = total['ruina'][0]
+            resto = f - (f // a) * a
+            finais = _resumo_welford(total['finais'], a)
+            finais['media'] += resto
+            configuracoes.append({
+                'fichas': f,
+                'ante': a,
+                'sessoes': num_sessoes,
+                'risco_ruina': ruinas / num_sessoes * 100,
+                'duracao': _resumo_histograma(total['duracoes']),
+                'rodadas_ate_ruina': _resumo_welford(total['ruina']) if ruinas else None,
+                'drawdown': _resumo_histograma(total['drawdowns'], a),
+                'fichas_finais': finais,
+            })
+    rodadas = sum(sum(v * c for v, c in enumerate(total['duracoes'])) for total in por_unidade.values())
+    return {
+        'estrategia': estrategia,
+        'probabilidades': dict(zip(("+2", "0", "-3", "-1"), probabilidades)),
+        'ev_por_ante': sum(g * p for g, p in zip(GANHOS, probabilidades)),
+        'max_rodadas': max_rodadas,
+        'sessoes': num_sessoes * len(unidades),
+        'rodadas': rodadas,
+        'segundos': segundos,
+        'rodadas_por_segundo': rodadas / segundos if segundos > 0 else 0.0,
+        'configuracoes': configuracoes,
+    }
+
+def imprimir_relatorio(relatorio):
+    print(f"Estratégia {relatorio['estrategia']}: EV {relatorio['ev_por_ante']:+.5f} ante por rodada; "
+          f"sessões de até {relatorio['max_rodadas']} rodadas")
+    print(f"{relatorio['sessoes']} sessões, {relatorio['rodadas']} rodadas em {relatorio['segundos']:.2f}s "
+          f"({relatorio['rodadas_por_segundo']:.0f} rodadas/s)")
+    print(f"{'fichas':>7s} {'ante':>5s} {'ruína':>7s} {'duração p10/p50/p90':>20s} {'até ruína':>10s} "
+          f"{'drawdown p50/p90/p99':>21s} {'fichas finais':>14s}")
+    for c in relatorio['configuracoes']:
+        duracao = c['duracao']
+        drawdown = c['drawdown']
+        ate_ruina = f"{c['rodadas_ate_ruina']['media']:.0f}" if c['rodadas_ate_ruina'] else "-"
+        print(f"{c['fichas']:>7d} {c['ante']:>5d} {c['risco_ruina']:>6.2f}% "
+              f"{duracao['p10']:>6d}/{duracao['p50']:>5d}/{duracao['p90']:>5d}  {ate_ruina:>10s} "
+              f"{drawdown['p50']:>6d}/{drawdown['p90']:>6d}/{drawdown['p99']:>6d}  "
+              f"{c['fichas_finais']['media']:>13.1f}")
+
+def _lista_inteiros(texto):
+    return [int(parte) for parte in texto.split(",") if parte]
+
+def criar_parser(add_help=True):
+    # Também usado como base do comando "banca" do headless.py
+    parser = argparse.ArgumentParser(description="Risco de ruína por banca e ante", add_help=add_help)
+    parser.add_argument("--fichas", type=_lista_inteiros, default=[250, 500, 1000, 2000, 5000])
+    parser.add_argument("--antes", type=_lista_inteiros, default=[5, 10, 25])
+    parser.add_argument("--sessoes", type=int, default=100000, help="Sessões por configuração")
+    parser.add_argument("--rodadas", type=int, default=1000, help="Rodadas máximas por sessão")
+    parser.add_argument("--sempre-call", action="store_true", help="Paga sempre em vez da estratégia ótima")
+    parser.add_argument("--semente", type=int)
+    parser.add_argument("--workers", type=int)
+    return parser
+
+def main(argv=None):
+    argumentos = criar_parser().parse_args(argv)
+    imprimir_relatorio(simular_bancas(argumentos.fichas, argumentos.antes, argumentos.sessoes, argumentos.rodadas,
+                                      "sempre_call" if argumentos.sempre_call else "otima", argumentos.semente,
+                                      argumentos.workers))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import numpy as np
+from game_logic import (
+    _BITS_NAIPES, _CHAVES, FORCA_QUALIFICACAO_DEALER, MASCARA_COMPLETA, CalculadorProbabilidades, indices_mascara,
+    tabelas_avaliador
+)
+
+# Versões em arrays das tabelas do AvaliadorMao. A tabela de valores é um dict
+# esparso (chaves até 5^13), então no modo vetorizado ela vira um par de
+# arrays ordenados consultado com searchsorted (os mesmos arrays lidos do disco).
+CHAVES = np.array(_CHAVES, dtype=np.int64)
+BITS = np.array([1 << i for i in range(52)], dtype=np.int64)
+_CHAVES_VALORES, _FORCAS_VALORES, _FORCAS_FLUSH = tabelas_avaliador()
+CHAVES_VALORES = np.frombuffer(_CHAVES_VALORES, dtype=np.int64)
+FORCAS_VALORES = np.frombuffer(_FORCAS_VALORES, dtype=np.int32)
+FORCAS_FLUSH = np.frombuffer(_FORCAS_FLUSH, dtype=np.int32)
+
+TAMANHO_BLOCO = 1 << 16
+
+# Códigos de resultado do showdown em lote, na mesma ordem de hand_log.RESULTADOS
+FOLD, NAO_QUALIFICOU, VITORIA, EMPATE, DERROTA = range(5)
+
+def forcas_lote(chaves, bits):
+    # chaves: soma das chaves das cartas de cada mão; bits: máscara das cartas
+    forcas = FORCAS_VALORES[np.searchsorted(CHAVES_VALORES, chaves >> _BITS_NAIPES)]
+    # Com até 7 cartas, um flush sempre supera a melhor mão sem flush
+    for naipe in range(4):
+        forcas = np.maximum(forcas, FORCAS_FLUSH[(bits >> (13 * naipe)) & 0x1FFF])
+    return forcas
+
+def avaliar_lote(indices):
+    indices = np.asarray(indices)
+    return forcas_lote(CHAVES[indices].sum(axis=1), np.bitwise_or.reduce(BITS[indices], axis=1))
+
+def resolver_showdown_lote(jogador, dealer, mesa, aposta_ante, call=None):
+    # Versão em arrays de GameLogic.resolver_showdown: jogador e dealer (n, 2) e
+    # mesa (n, 5) com índices de cartas; aposta_ante escalar ou (n,); call opcional
+    # (n,) com False nas rodadas em que o jogador desistiu (ganho -ante)
+    jogador = np.asarray(jogador, dtype=np.intp)
+    dealer = np.asarray(dealer, dtype=np.intp)
+    mesa = np.asarray(mesa, dtype=np.intp)
+    chave_mesa = CHAVES[mesa].sum(axis=1)
+    bits_mesa = np.bitwise_or.reduce(BITS[mesa], axis=1)
+    forca_jogador = forcas_lote(chave_mesa + CHAVES[jogador].sum(axis=1),
+                                bits_mesa | BITS[jogador[:, 0]] | BITS[jogador[:, 1]])
+    forca_dealer = forcas_lote(chave_mesa + CHAVES[dealer].sum(axis=1),
+                               bits_mesa | BITS[dealer[:, 0]] | BITS[dealer[:, 1]])
+    
+    qualificou = forca_dealer >= FORCA_QUALIFICACAO_DEALER
+    resultado = np.select([~qualificou, forca_jogador > forca_dealer, forca_jogador == forca_dealer],
+                          [NAO_QUALIFICOU, VITORIA, EMPATE], DERROTA).astype(np.int8)
+    ante = np.broadcast_to(np.asarray(aposta_ante, dtype=np.int64), resultado.shape)
+    ganho = np.select([resultado <= VITORIA, resultado == EMPATE], [ante * 2, 0], -ante * 3)
+    if call is not None:
+        call = np.asarray(call, dtype=bool)
+        resultado = np.where(call, resultado, FOLD).astype(np.int8)
+        ganho = np.where(call, ganho, -ante)
+    return {
+        'forca_jogador': forca_jogador,
+        'forca_dealer': forca_dealer,
+        'qualificou': qualificou,
+        'resultado': resultado,
+        'ganho': ganho,
+    }
+
+def sortear_lote(baralho_restante, num_cartas, num_simulacoes, rng):
+    # Fisher-Yates parcial vetorizado: só as primeiras num_cartas posições de cada linha
+    restante = np.asarray(baralho_restante, dtype=np.int8)
+    baralhos = np.tile(restante, (num_simulacoes, 1))
+    linhas = np.arange(num_simulacoes)
+    for j in range(num_cartas):
+        sorteio = rng.integers(j, len(restante), size=num_simulacoes)
+        escolhidas = baralhos[linhas, sorteio]
+        baralhos[linhas, sorteio] = baralhos[:, j]
+        baralhos[:, j] = escolhidas
+    return baralhos[:, :num_cartas].astype(np.intp)
+
+def contar_resultados_lote(indices_jogador, indices_mesa, num_simulacoes, rng):
+    conhecidas = indices_jogador + indices_mesa
+    baralho_restante = indices_mascara(MASCARA_COMPLETA & ~sum(1 << i for i in conhecidas))
+    cartas_faltantes = 5 - len(indices_mesa)
+    
+    chave_mesa = sum(_CHAVES[i] for i in indices_mesa)
+    bits_mesa = sum(1 << i for i in indices_mesa)
+    chave_jogador = chave_mesa + sum(_CHAVES[i] for i in indices_jogador)
+    bits_jogador = bits_mesa | sum(1 << i for i in indices_jogador)
+    
+    vitorias = empates = derrotas = 0
+    while num_simulacoes > 0:
+        n = min(num_simulacoes, TAMANHO_BLOCO)
+        num_simulacoes -= n
+        
+        sorteadas = sortear_lote(baralho_restante, cartas_faltantes + 2, n, rng)
+        mesa = sorteadas[:, :cartas_faltantes]
+        dealer = sorteadas[:, cartas_faltantes:]
+        
+        chave_runout = CHAVES[mesa].sum(axis=1)
+        bits_runout = np.bitwise_or.reduce(BITS[mesa], axis=1) if cartas_faltantes else np.zeros(n, dtype=np.int64)
+        
+        forca_jogador = forcas_lote(chave_jogador + chave_runout, bits_jogador | bits_runout)
+        forca_dealer = forcas_lote(
+            chave_mesa + chave_runout + CHAVES[dealer].sum(axis=1),
+            bits_mesa | bits_runout | BITS[dealer[:, 0]] | BITS[dealer[:, 1]],
+        )
+        
+        v = int(np.count_nonzero(forca_jogador > forca_dealer))
+        e = int(np.count_nonzero(forca_jogador == forca_dealer))
+        vitorias += v
+        empates += e
+        derrotas += n - v - e
+    
+    return vitorias, empates, derrotas
+
+def calcular_equity_lote(mao_jogador, cartas_comunitarias, num_simulacoes=100000, semente=None):
+    if not mao_jogador:
+        return {'vitoria': 0, 'empate': 0, 'derrota': 100}
+    if 52 - len(mao_jogador) - len(cartas_comunitarias) < 7:
+        return {'vitoria': 50, 'empate': 10, 'derrota': 40}
+    
+    rng = np.random.default_rng(semente)
+    vitorias, empates, derrotas = contar_resultados_lote(
+        [c.indice for c in mao_jogador], [c.indice for c in cartas_comunitarias], num_simulacoes, rng
+    )
+    
+    return CalculadorProbabilidades._percentuais(vitorias, empates, derrotas)
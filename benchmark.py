@@ -0,0 +1,349 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from bankroll import simular_bancas
+from equity_cache import ativar_cache, desativar_cache
+from game_logic import (
+    TOLERANCIA_STATS, BARALHO_COMPLETO, AvaliadorMao, Baralho, CalculadorProbabilidades, GameLogic, RastreadorEquity
+)
+from optimal_strategy import TabelaEstrategia
+from random_streams import FluxoAleatorio
+from simulator import SimuladorRodadas
+
+# Suíte de benchmarks com sementes e corpora fixos. Cada métrica guarda o valor,
+# a unidade e se maior é melhor, para que duas execuções possam ser comparadas.
+SEMENTE = 20240601
+
+def gerar_corpus(num_maos, num_cartas, semente=SEMENTE):
+    rng = random.Random(f"{semente}:{num_maos}:{num_cartas}")
+    return [rng.sample(BARALHO_COMPLETO, num_cartas) for _ in range(num_maos)]
+
+def cronometrar(funcao, repeticoes=3):
+    # Melhor de N execuções, para reduzir o ruído de outros processos
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def metrica(valor, unidade, maior_melhor=True):
+    return {'valor': valor, 'unidade': unidade, 'maior_melhor': maior_melhor}
+
+def bench_avaliador(escala):
+    resultados = {}
+    for num_cartas in (5, 6, 7):
+        corpus = gerar_corpus(int(20000 * escala), num_cartas)
+        segundos = cronometrar(lambda: [AvaliadorMao.avaliar_mao(mao) for mao in corpus])
+        resultados[f"avaliar_mao_{num_cartas}_cartas"] = metrica(len(corpus) / segundos, "maos/s")
+    corpus = gerar_corpus(int(20000 * escala), 7)
+    segundos = cronometrar(lambda: [AvaliadorMao.forca(mao) for mao in corpus])
+    resultados["forca_7_cartas"] = metrica(len(corpus) / segundos, "maos/s")
+    return resultados
+
+def bench_equity(escala):
+    resultados = {}
+    num_simulacoes = int(2000 * escala)
+    for nome, num_mesa in (("preflop", 0), ("flop", 3)):
+        corpus = gerar_corpus(5, 2 + num_mesa)
+        segundos = cronometrar(lambda: [
+            CalculadorProbabilidades.calcular_equity(mao[:2], mao[2:], num_simulacoes, exato=False, semente=SEMENTE)
+            for mao in corpus
+        ], repeticoes=1)
+        resultados[f"equity_{nome}_simulacoes"] = metrica(len(corpus) * num_simulacoes / segundos, "simulacoes/s")
+    
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        corpus = gerar_corpus(3, 5)
+        num_lote = int(100000 * escala)
+        segundos = cronometrar(lambda: [
+            CalculadorProbabilidades.calcular_equity(mao[:2], mao[2:], num_lote, exato=False, vetorizado=True,
+                                                     semente=SEMENTE)
+            for mao in corpus
+        ], repeticoes=1)
+        resultados["equity_flop_vetorizada"] = metrica(len(corpus) * num_lote / segundos, "simulacoes/s")
+        
+        # Ranges: duelo exato no flop e 4 jogadores por Monte Carlo
+        from ranges import equity_ranges
+        segundos = cronometrar(lambda: equity_ranges(["top 20%", "aleatoria"], [0, 20, 33], exato=True), repeticoes=1)
+        resultados["equity_ranges_flop_ms"] = metrica(segundos * 1000, "ms", maior_melhor=False)
+        casos = []
+        segundos = cronometrar(lambda: casos.append(equity_ranges(["AA", "aleatoria", "aleatoria", "aleatoria"], [],
+                                                                  num_boards=int(2000 * escala),
+                                                                  semente=SEMENTE)['casos']), repeticoes=1)
+        resultados["equity_ranges_multiplos"] = metrica(casos[-1] / segundos, "amostras/s")
+    
+    # Modo adaptativo com a precisão usada nas stats do jogo
+    corpus = gerar_corpus(int(20 * escala), 5)
+    simulacoes = []
+    segundos = cronometrar(lambda: simulacoes.extend(
+        CalculadorProbabilidades.calcular_equity(mao[:2], mao[2:], exato=False, semente=SEMENTE,
+                                                 tolerancia=TOLERANCIA_STATS)['simulacoes']
+        for mao in corpus
+    ), repeticoes=1)
+    resultados["equity_adaptativa_flop_ms"] = metrica(segundos / len(corpus) * 1000, "ms", maior_melhor=False)
+    resultados["equity_adaptativa_flop_simulacoes"] = metrica(statistics.mean(simulacoes), "simulacoes",
+                                                              maior_melhor=False)
+    
+    for nome, num_mesa in (("flop", 3), ("turn", 4), ("river", 5)):
+        corpus = gerar_corpus(1 if num_mesa == 3 else 10, 2 + num_mesa)
+        segundos = cronometrar(lambda: [
+            CalculadorProbabilidades.calcular_equity_exata(mao[:2], mao[2:]) for mao in corpus
+        ], repeticoes=1)
+        resultados[f"equity_exata_{nome}_ms"] = metrica(segundos / len(corpus) * 1000, "ms", maior_melhor=False)
+    
+    # Rastreador das stats do jogo: contagem no flop (na thread de stats), só filtragem no turn e no river
+    corpus = gerar_corpus(int(10 * escala) or 1, 7)
+    tempos = {"preparar": 0.0, "turn": 0.0, "river": 0.0}
+    for mao in corpus:
+        rastreador = RastreadorEquity(mao[:2])
+        inicio = time.perf_counter()
+        rastreador.preparar(mao[2:5])
+        tempos["preparar"] += time.perf_counter() - inicio
+        for nome, num_mesa in (("turn", 4), ("river", 5)):
+            inicio = time.perf_counter()
+            rastreador.equity(mao[2:2 + num_mesa])
+            tempos[nome] += time.perf_counter() - inicio
+    for nome, segundos in tempos.items():
+        resultados[f"rastreador_{nome}_ms"] = metrica(segundos / len(corpus) * 1000, "ms", maior_melhor=False)
+    
+    # Consulta repetida com o cache ligado (após uma passada que o preenche)
+    ativar_cache()
+    corpus = gerar_corpus(int(200 * escala), 5)
+    consultar = lambda: [CalculadorProbabilidades.calcular_equity(mao[:2], mao[2:], 500) for mao in corpus]
+    consultar()
+    segundos = cronometrar(consultar)
+    desativar_cache()
+    resultados["equity_cache_acerto_us"] = metrica(segundos / len(corpus) * 1e6, "us", maior_melhor=False)
+    return resultados
+
+def bench_outs(escala):
+    resultados = {}
+    for nome, num_mesa in (("flop", 3), ("turn", 4)):
+        corpus = gerar_corpus(int(2000 * escala), 2 + num_mesa)
+        segundos = cronometrar(lambda: [CalculadorProbabilidades.calcular_outs(mao[:2], mao[2:]) for mao in corpus])
+        resultados[f"outs_{nome}_us"] = metrica(segundos / len(corpus) * 1e6, "us", maior_melhor=False)
+    return resultados
+
+def bench_rodadas(escala):
+    # Rodadas completas pelo GameLogic (com stats síncronas) e pelo simulador headless
+    num_rodadas = int(200 * escala)
+    
+    def jogar():
+        random.seed(SEMENTE)
+        jogo = GameLogic(stats_em_segundo_plano=False)
+        for _ in range(num_rodadas):
+            jogo.fichas = 1000
+            jogo.iniciar_rodada()
+            while jogo.fase != "FIM":
+                jogo.call()
+    
+    segundos = cronometrar(jogar, repeticoes=1)
+    
+    # Distribuição das 9 cartas de uma rodada num baralho reaproveitado
+    baralho = Baralho(FluxoAleatorio(SEMENTE))
+    num_distribuicoes = int(50000 * escala)
+    
+    def distribuir():
+        for _ in range(num_distribuicoes):
+            baralho.embaralhar()
+            baralho.dar_cartas(9)
+    
+    segundos_baralho = cronometrar(distribuir)
+    num_headless = int(100000 * escala)
+    headless = SimuladorRodadas(semente=SEMENTE).simular(num_headless)
+    
+    # Carga da tabela de estratégia ótima (feita uma vez pelo simulador e pela UI)
+    num_cargas = int(200 * escala)
+    segundos_carga = cronometrar(lambda: [TabelaEstrategia().fechar() for _ in range(num_cargas)])
+    
+    # Sessões do simulador de banca (NumPy quando disponível), num só processo
+    bancas = simular_bancas([1000], [10], int(20000 * escala), 500, semente=SEMENTE, workers=1)
+    resultados = {
+        "rodadas_game_logic": metrica(num_rodadas / segundos, "rodadas/s"),
+        "distribuicoes_baralho": metrica(num_distribuicoes / segundos_baralho, "rodadas/s"),
+        "rodadas_headless": metrica(headless['rodadas_por_segundo'], "rodadas/s"),
+        "estrategia_carga_us": metrica(segundos_carga / num_cargas * 1e6, "us", maior_melhor=False),
+        "rodadas_banca": metrica(bancas['rodadas_por_segundo'], "rodadas/s"),
+    }
+    
+    try:
+        import numpy as np
+    except ImportError:
+        return resultados
+    from batch_eval import resolver_showdown_lote, sortear_lote
+    
+    # Showdown e pagamento em lote sobre rodadas já distribuídas
+    num_lote = int(1000000 * escala)
+    cartas = sortear_lote(range(52), 9, num_lote, np.random.default_rng(SEMENTE))
+    segundos_lote = cronometrar(lambda: resolver_showdown_lote(cartas[:, :2], cartas[:, 2:4], cartas[:, 4:], 10))
+    resultados["showdown_lote"] = metrica(num_lote / segundos_lote, "rodadas/s")
+    return resultados
+
+def bench_interface(escala):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from game_interface import GameInterface
+    
+    random.seed(SEMENTE)
+    jogo = GameLogic(stats_em_segundo_plano=False)
+    interface = GameInterface(jogo)
+    for _ in range(5):
+        jogo.iniciar_rodada()
+        jogo.fold()
+    jogo.iniciar_rodada()
+    jogo.call()
+    
+    tempos = []
+    for _ in range(int(300 * escala)):
+        inicio = time.perf_counter()
+        interface.desenhar_tela()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    
+    # Quadro sem mudança de estado: o loop de main.py não redesenha nada
+    interface.atualizar_tela()
+    num_ociosos = int(10000 * escala)
+    segundos_ocioso = cronometrar(lambda: [interface.atualizar_tela() for _ in range(num_ociosos)])
+    pygame.quit()
+    
+    tempos.sort()
+    return {
+        "frame_p50_ms": metrica(statistics.median(tempos), "ms", maior_melhor=False),
+        "frame_p95_ms": metrica(tempos[int(len(tempos) * 0.95) - 1], "ms", maior_melhor=False),
+        "frame_ocioso_us": metrica(segundos_ocioso / num_ociosos * 1e6, "us", maior_melhor=False),
+    }
+
+def bench_partida(escala):
+    # Partida a frio em processos novos (como um worker ou um comando de CLI): o
+    # interpretador vazio, o import do game_logic com e sem as tabelas em disco e
+    # comandos completos do headless
+    import subprocess
+    import tempfile
+    
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    repeticoes = max(1, int(5 * escala))
+    
+    def medir(argumentos, ambiente=None):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            subprocess.run([sys.executable] + argumentos, cwd=diretorio, env=ambiente() if ambiente else None,
+                           check=True, stdout=subprocess.DEVNULL)
+            tempos.append(time.perf_counter() - inicio)
+        return metrica(statistics.median(tempos) * 1000, "ms", maior_melhor=False)
+    
+    with tempfile.TemporaryDirectory() as temporario:
+        # Um diretório de tabelas novo a cada execução: o avaliador é construído e gravado
+        diretorios = iter(range(repeticoes))
+        
+        def sem_tabelas():
+            return dict(os.environ, CASINO_HOLDEM_TABELAS=os.path.join(temporario, str(next(diretorios))))
+        
+        # O import não carrega o avaliador; a primeira mão avaliada, sim
+        carregar = "import game_logic; game_logic.tabelas_avaliador()"
+        return {
+            "partida_python_ms": medir(["-c", "pass"]),
+            "partida_game_logic_ms": medir(["-c", "import game_logic"]),
+            "partida_avaliador_ms": medir(["-c", carregar]),
+            "partida_avaliador_sem_tabelas_ms": medir(["-c", carregar], sem_tabelas),
+            "partida_headless_equity_ms": medir(["-m", "headless", "equity", "AsKh", "--mesa", "Qh7c2d",
+                                                 "--simulacoes", "1000", "--semente", str(SEMENTE)]),
+            "partida_headless_simular_ms": medir(["-m", "headless", "simular", "1000", "--semente", str(SEMENTE)]),
+        }
+
+def bench_replay(escala):
+    # Sessões gravadas reproduzidas sem interface, uma a uma e em paralelo
+    import tempfile
+    from session import gravar_sessao_sintetica, reproduzir_sessoes
+    
+    # Sessões que quebram terminam antes: muitas sessões curtas, como as de jogadores reais
+    num_sessoes = 32
+    num_rodadas = int(500 * escala)
+    with tempfile.TemporaryDirectory() as temporario:
+        caminhos = [gravar_sessao_sintetica(os.path.join(temporario, f"sessao_{i}.jsonl"), SEMENTE + i, num_rodadas)
+                    for i in range(num_sessoes)]
+        serial = reproduzir_sessoes(caminhos, workers=1)
+        paralelo = reproduzir_sessoes(caminhos)
+    if serial['divergentes'] or paralelo['divergentes']:
+        raise RuntimeError("Sessões sintéticas divergiram na reprodução")
+    return {
+        "replay_acoes": metrica(serial['acoes_por_segundo'], "ações/s"),
+        "replay_acoes_paralelo": metrica(paralelo['acoes_por_segundo'], "ações/s"),
+    }
+
+BENCHMARKS = {
+    "avaliador": bench_avaliador,
+    "equity": bench_equity,
+    "outs": bench_outs,
+    "rodadas": bench_rodadas,
+    "interface": bench_interface,
+    "partida": bench_partida,
+    "replay": bench_replay,
+}
+
+def executar(nomes=None, escala=1.0):
+    metricas = {}
+    for nome in nomes or BENCHMARKS:
+        metricas.update(BENCHMARKS[nome](escala))
+    return {
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'data': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'escala': escala,
+        'metricas': metricas,
+    }
+
+def comparar(atual, referencia, limite=0.10):
+    # Regressão: piora maior que o limite relativo, no sentido de cada métrica
+    regressoes = []
+    for nome, dados in atual['metricas'].items():
+        base = referencia['metricas'].get(nome)
+        if not base or not base['valor']:
+            continue
+        variacao = (dados['valor'] - base['valor']) / base['valor']
+        if not dados['maior_melhor']:
+            variacao = -variacao
+        if variacao < -limite:
+            regressoes.append((nome, base['valor'], dados['valor'], variacao))
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Casino Hold'em")
+    parser.add_argument("benchmarks", nargs="*", help=f"entre {', '.join(BENCHMARKS)} (padrão: todos)")
+    parser.add_argument("--saida", help="grava os resultados em JSON")
+    parser.add_argument("--referencia", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--limite", type=float, default=0.10, help="piora relativa tolerada (padrão 0.10)")
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplica o tamanho dos corpora")
+    args = parser.parse_args(argv)
+    desconhecidos = [nome for nome in args.benchmarks if nome not in BENCHMARKS]
+    if desconhecidos:
+        parser.error(f"benchmark desconhecido: {', '.join(desconhecidos)}")
+    
+    resultado = executar(args.benchmarks, args.escala)
+    for nome, dados in resultado['metricas'].items():
+        print(f"{nome:32s} {dados['valor']:14.2f} {dados['unidade']}")
+    
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+    
+    if args.referencia:
+        with open(args.referencia) as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.limite)
+        for nome, antes, depois, variacao in regressoes:
+            print(f"REGRESSÃO {nome}: {antes:.2f} -> {depois:.2f} ({variacao * 100:+.1f}%)")
+        if regressoes:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
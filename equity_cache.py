@@ -0,0 +1,132 @@
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import instrumentation
+from game_logic import CalculadorProbabilidades
+from tables import caminho_dados
+
+# Cache de equity na frente do CalculadorProbabilidades. A chave é a forma
+# canônica (mão, mesa) por troca de naipes mais o modo do cálculo (exato,
+# simulações fixas ou adaptativo; ver calcular_equity), então situações
+# isomorfas compartilham a mesma entrada. Descarte LRU ao passar da
+# capacidade e validade opcional (ttl).
+ARQUIVO_CACHE = caminho_dados("equity_cache.bin")
+MAGIA = b"CHEC"
+VERSAO = 2
+CABECALHO = struct.Struct("<4sII")
+# (máscara da mão, máscara da mesa, modo, criado em, vitória, empate, derrota,
+# margem, intervalo, simulações); os três últimos só nos resultados adaptativos,
+# com simulações = 0 nos demais
+REGISTRO = struct.Struct("<QQidddddddQ")
+
+class CacheEquity:
+    def __init__(self, capacidade=4096, ttl=None):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+    
+    def obter(self, chave):
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and self.ttl is not None and time.time() - entrada[0] > self.ttl:
+                del self._entradas[chave]
+                self.expirados += 1
+                entrada = None
+            if entrada is None:
+                self.falhas += 1
+                instrumentation.contar("cache.falhas")
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+        instrumentation.contar("cache.acertos")
+        return entrada[1]
+    
+    def guardar(self, chave, resultado, criado=None):
+        with self._trava:
+            self._entradas[chave] = (time.time() if criado is None else criado, dict(resultado))
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+    
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self.acertos = self.falhas = self.expirados = 0
+    
+    def __len__(self):
+        return len(self._entradas)
+    
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            'tamanho': len(self._entradas),
+            'capacidade': self.capacidade,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'expirados': self.expirados,
+            'taxa_acerto': self.acertos / consultas * 100 if consultas else 0.0,
+        }
+    
+    def salvar(self, caminho=ARQUIVO_CACHE):
+        # Grava da entrada mais antiga para a mais recente, preservando a ordem LRU
+        with self._trava:
+            entradas = list(self._entradas.items())
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        temporario = caminho + ".tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(CABECALHO.pack(MAGIA, VERSAO, len(entradas)))
+            for (mao, mesa, modo), (criado, resultado) in entradas:
+                inferior, superior = resultado.get('intervalo', (0.0, 0.0))
+                arquivo.write(REGISTRO.pack(mao, mesa, modo, criado, resultado['vitoria'],
+                                            resultado['empate'], resultado['derrota'],
+                                            resultado.get('margem', 0.0), inferior, superior,
+                                            resultado.get('simulacoes', 0)))
+        os.replace(temporario, caminho)
+        return len(entradas)
+    
+    def carregar(self, caminho=ARQUIVO_CACHE):
+        # Arquivo ausente ou inválido: o cache só começa vazio
+        try:
+            with open(caminho, "rb") as arquivo:
+                dados = arquivo.read()
+            magia, versao, num_registros = CABECALHO.unpack_from(dados, 0)
+        except (OSError, struct.error):
+            return 0
+        if magia != MAGIA or versao != VERSAO or len(dados) != CABECALHO.size + REGISTRO.size * num_registros:
+            return 0
+        
+        agora = time.time()
+        carregados = 0
+        for (mao, mesa, modo, criado, vitoria, empate, derrota, margem, inferior, superior,
+             simulacoes) in REGISTRO.iter_unpack(dados[CABECALHO.size:]):
+            if self.ttl is not None and agora - criado > self.ttl:
+                continue
+            resultado = {'vitoria': vitoria, 'empate': empate, 'derrota': derrota}
+            if simulacoes:
+                # Mesmo formato de calcular_equity_adaptativa
+                resultado.update(intervalo=(inferior, superior), margem=margem, simulacoes=simulacoes)
+            self.guardar((mao, mesa, modo), resultado, criado)
+            carregados += 1
+        return carregados
+
+def ativar_cache(capacidade=4096, ttl=None, caminho=None):
+    # Instala o cache no CalculadorProbabilidades; com caminho, parte do que foi salvo
+    cache = CacheEquity(capacidade, ttl)
+    if caminho:
+        cache.carregar(caminho)
+    CalculadorProbabilidades.cache = cache
+    return cache
+
+def desativar_cache(caminho=None):
+    cache = CalculadorProbabilidades.cache
+    CalculadorProbabilidades.cache = None
+    if cache is not None and caminho:
+        cache.salvar(caminho)
+    return cache
@@ -1,10 +1,23 @@
 import pygame
-from game_logic import Carta, Naipe
+import instrumentation
+from collections import OrderedDict
+from game_logic import BARALHO_COMPLETO, Naipe
+from session import aplicar_acao
 
 # Configurações
 WIDTH, HEIGHT = 1400, 900
 FPS = 60
 CARD_WIDTH, CARD_HEIGHT = 70, 100
+TAMANHO_CACHE_TEXTOS = 256
+
+# Regiões redesenhadas independentemente por atualizar_tela
+REGIAO_FICHAS = pygame.Rect(40, 75, 320, 75)
+REGIAO_CARTAS = pygame.Rect(WIDTH//2 - 200, 145, 450, 510)
+REGIAO_MENSAGEM = pygame.Rect(0, 660, WIDTH, 40)
+REGIAO_BOTOES = pygame.Rect(WIDTH//2 - 225, 725, 450, 60)
+REGIAO_STATS = pygame.Rect(WIDTH - 380, 80, 380, 400)
+REGIAO_HISTORICO = pygame.Rect(50, 180, 280, 320)
+REGIAO_OVERLAY = pygame.Rect(10, HEIGHT - 90, 460, 80)
 
 # Cores
 WHITE = (255, 255, 255)
@@ -18,12 +31,14 @@ GRAY = (128, 128, 128)
 LIGHT_GRAY = (200, 200, 200)
 
 class GameInterface:
-    def __init__(self, game_logic):
+    def __init__(self, game_logic, gravador=None):
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Casino Hold'em - Análise Estatística")
         self.clock = pygame.time.Clock()
         self.game = game_logic
+        # Gravação opcional da sessão (session.GravadorSessao): cada ação do jogador
+        self.gravador = gravador
         
         # Fontes
         self.font_titulo = pygame.font.Font(None, 50)
@@ -32,41 +47,132 @@ class GameInterface:
         self.font_texto = pygame.font.Font(None, 28)
         self.font_pequeno = pygame.font.Font(None, 26)
         self.font_mini = pygame.font.Font(None, 22)
+        
+        # Overlay de desempenho (F3)
+        self.mostrar_overlay = False
+        
+        # Textos renderizados, por (fonte, texto, cor), com descarte LRU
+        self._cache_textos = OrderedDict()
+        
+        # As 52 faces e o verso são renderizados uma vez; desenhar_carta só faz blit
+        self._verso = self._renderizar_carta(None)
+        self._faces = [self._renderizar_carta(carta) for carta in BARALHO_COMPLETO]
+        
+        # Regiões da tela sem sobreposição: (retângulo, desenho, assinatura do estado).
+        # atualizar_tela só repinta as regiões cuja assinatura mudou.
+        self._regioes = [
+            (REGIAO_FICHAS, self.desenhar_fichas, lambda: (self.game.fichas, self.game.aposta_ante)),
+            (REGIAO_CARTAS, self.desenhar_cartas, self._assinatura_cartas),
+            (REGIAO_MENSAGEM, self.desenhar_mensagem, lambda: self.game.mensagem),
+            (REGIAO_BOTOES, self.desenhar_botoes, lambda: self.game.fase),
+            (REGIAO_STATS, self.desenhar_painel_stats, self._assinatura_stats),
+            (REGIAO_HISTORICO, self.desenhar_historico, self._assinatura_historico),
+        ]
+        self._assinaturas = None
+        self._versao_desenhada = None
+        self._overlay_desenhado = False
     
-    def desenhar_carta(self, carta, x, y, virada=False):
-        if virada:
-            pygame.draw.rect(self.screen, BLUE, (x, y, CARD_WIDTH, CARD_HEIGHT), border_radius=5)
-            pygame.draw.rect(self.screen, WHITE, (x, y, CARD_WIDTH, CARD_HEIGHT), 2, border_radius=5)
+    def renderizar_texto(self, fonte, texto, cor):
+        chave = (fonte, texto, cor)
+        superficie = self._cache_textos.get(chave)
+        if superficie is None:
+            superficie = fonte.render(texto, True, cor)
+            self._cache_textos[chave] = superficie
+            if len(self._cache_textos) > TAMANHO_CACHE_TEXTOS:
+                self._cache_textos.popitem(last=False)
+        else:
+            self._cache_textos.move_to_end(chave)
+        return superficie
+    
+    def _renderizar_carta(self, carta):
+        superficie = pygame.Surface((CARD_WIDTH, CARD_HEIGHT), pygame.SRCALPHA)
+        retangulo = (0, 0, CARD_WIDTH, CARD_HEIGHT)
+        if carta is None:
+            pygame.draw.rect(superficie, BLUE, retangulo, border_radius=5)
+            pygame.draw.rect(superficie, WHITE, retangulo, 2, border_radius=5)
             text = self.font_grande.render("?", True, WHITE)
-            self.screen.blit(text, (x + CARD_WIDTH//2 - 10, y + CARD_HEIGHT//2 - 15))
+            superficie.blit(text, (CARD_WIDTH//2 - 10, CARD_HEIGHT//2 - 15))
         else:
-            pygame.draw.rect(self.screen, WHITE, (x, y, CARD_WIDTH, CARD_HEIGHT), border_radius=5)
-            pygame.draw.rect(self.screen, BLACK, (x, y, CARD_WIDTH, CARD_HEIGHT), 2, border_radius=5)
+            pygame.draw.rect(superficie, WHITE, retangulo, border_radius=5)
+            pygame.draw.rect(superficie, BLACK, retangulo, 2, border_radius=5)
             
             cor = RED if carta.naipe in [Naipe.COPAS, Naipe.OUROS] else BLACK
             
             text_valor = self.font_medio.render(carta.valor, True, cor)
             text_naipe = self.font_medio.render(carta.naipe.value, True, cor)
             
-            self.screen.blit(text_valor, (x + 5, y + 5))
-            self.screen.blit(text_naipe, (x + CARD_WIDTH//2 - 10, y + CARD_HEIGHT//2 - 15))
+            superficie.blit(text_valor, (5, 5))
+            superficie.blit(text_naipe, (CARD_WIDTH//2 - 10, CARD_HEIGHT//2 - 15))
+        return superficie.convert_alpha()
+    
+    def desenhar_carta(self, carta, x, y, virada=False):
+        self.screen.blit(self._verso if virada else self._faces[carta.indice], (x, y))
     
     def desenhar_tela(self):
+        # Versão e assinaturas lidas antes de desenhar: stats publicadas pela thread
+        # durante o desenho ficam para o próximo atualizar_tela em vez de se perderem
+        self._versao_desenhada = self.game.versao
+        self._assinaturas = [assinatura() for _, _, assinatura in self._regioes]
         self.screen.fill(DARK_GREEN)
         
         # Título
-        titulo = self.font_titulo.render("CASINO HOLD'EM", True, GOLD)
+        titulo = self.renderizar_texto(self.font_titulo, "CASINO HOLD'EM", GOLD)
         self.screen.blit(titulo, (WIDTH//2 - 200, 20))
         
-        # Fichas e Ante
-        fichas_text = self.font_grande.render(f"Fichas: ${self.game.fichas}", True, WHITE)
+        for _, desenhar, _ in self._regioes:
+            desenhar()
+        
+        if self.mostrar_overlay:
+            self.desenhar_overlay()
+        
+        pygame.display.flip()
+        self._overlay_desenhado = self.mostrar_overlay
+    
+    def atualizar_tela(self):
+        # Redesenha só as regiões cujo estado mudou desde o último quadro
+        if self._assinaturas is None:
+            self.desenhar_tela()
+            return
+        if self.game.versao == self._versao_desenhada and not self.mostrar_overlay and not self._overlay_desenhado:
+            return
+        self._versao_desenhada = self.game.versao
+        
+        retangulos = []
+        for i, (retangulo, desenhar, assinatura) in enumerate(self._regioes):
+            atual = assinatura()
+            if atual != self._assinaturas[i]:
+                self._assinaturas[i] = atual
+                self.screen.fill(DARK_GREEN, retangulo)
+                desenhar()
+                retangulos.append(retangulo)
+        
+        if self.mostrar_overlay or self._overlay_desenhado:
+            self.screen.fill(DARK_GREEN, REGIAO_OVERLAY)
+            if self.mostrar_overlay:
+                self.desenhar_overlay()
+            self._overlay_desenhado = self.mostrar_overlay
+            retangulos.append(REGIAO_OVERLAY)
+        
+        if retangulos:
+            pygame.display.update(retangulos)
+    
+    def desatualizada(self):
+        return self.game.versao != self._versao_desenhada
+    
+    def invalidar(self):
+        # Força um redesenho completo no próximo atualizar_tela (janela exposta etc.)
+        self._assinaturas = None
+    
+    def desenhar_fichas(self):
+        fichas_text = self.renderizar_texto(self.font_grande, f"Fichas: ${self.game.fichas}", WHITE)
         self.screen.blit(fichas_text, (50, 80))
         
-        ante_text = self.font_grande.render(f"Ante: ${self.game.aposta_ante}", True, WHITE)
+        ante_text = self.renderizar_texto(self.font_grande, f"Ante: ${self.game.aposta_ante}", WHITE)
         self.screen.blit(ante_text, (50, 120))
-        
+    
+    def desenhar_cartas(self):
         # Mão do Dealer
-        dealer_label = self.font_texto.render("DEALER", True, WHITE)
+        dealer_label = self.renderizar_texto(self.font_texto, "DEALER", WHITE)
         self.screen.blit(dealer_label, (WIDTH//2 - 40, 150))
         
         if self.game.fase == "FIM":
@@ -78,42 +184,71 @@ class GameInterface:
         
         # Cartas Comunitárias
         if len(self.game.cartas_comunitarias) > 0:
-            comunitarias_label = self.font_texto.render("MESA", True, WHITE)
+            comunitarias_label = self.renderizar_texto(self.font_texto, "MESA", WHITE)
             self.screen.blit(comunitarias_label, (WIDTH//2 - 30, 330))
             
             for i, carta in enumerate(self.game.cartas_comunitarias):
                 self.desenhar_carta(carta, WIDTH//2 - 190 + i * 90, 360)
         
         # Mão do Jogador
-        jogador_label = self.font_texto.render("VOCÊ", True, GOLD)
+        jogador_label = self.renderizar_texto(self.font_texto, "VOCÊ", GOLD)
         self.screen.blit(jogador_label, (WIDTH//2 - 30, 520))
         
         if len(self.game.mao_jogador) > 0:
             for i, carta in enumerate(self.game.mao_jogador):
                 self.desenhar_carta(carta, WIDTH//2 - 80 + i * 90, 550)
-        
-        # Mensagem
-        msg = self.font_texto.render(self.game.mensagem, True, WHITE)
+    
+    def desenhar_mensagem(self):
+        msg = self.renderizar_texto(self.font_texto, self.game.mensagem, WHITE)
         msg_rect = msg.get_rect(center=(WIDTH//2, 680))
         self.screen.blit(msg, msg_rect)
-        
-        # Botões
-        self.desenhar_botoes()
-        
-        # Painel de Análise Estatística
-        self.desenhar_painel_stats()
-        
-        # Histórico
-        self.desenhar_historico()
-        
-        pygame.display.flip()
+    
+    def _assinatura_cartas(self):
+        return (self.game.fase, tuple(self.game.mao_dealer), tuple(self.game.cartas_comunitarias),
+                tuple(self.game.mao_jogador))
+    
+    def _assinatura_stats(self):
+        return (self.game.fase, self.game.stats, self.game.calculando_stats())
+    
+    def _assinatura_historico(self):
+        return (self.game.total_jogos, self.game.total_vitorias, list(self.game.historico))
+    
+    def alternar_overlay(self):
+        # O overlay liga junto a instrumentação; desligado, ela não custa nada
+        self.mostrar_overlay = not self.mostrar_overlay
+        if self.mostrar_overlay:
+            instrumentation.limpar()
+            instrumentation.ativar()
+        else:
+            instrumentation.desativar()
+    
+    def desenhar_overlay(self):
+        frame = instrumentation.resumo_tempo("interface.atualizar_tela")
+        stats = instrumentation.resumo_tempo("stats.calcular")
+        contadores = instrumentation.resumo()['contadores']
+        
+        linhas = [
+            f"Frame: p50 {frame['p50_ms']:.1f} ms | p95 {frame['p95_ms']:.1f} ms | p99 {frame['p99_ms']:.1f} ms"
+            if frame else "Frame: -",
+            f"Último cálculo de stats: {stats['ultimo_ms']:.1f} ms" if stats else "Último cálculo de stats: -",
+            f"Simulações: {contadores.get('equity.simulacoes', 0)} | "
+            f"Casos exatos: {contadores.get('equity.casos_exatos', 0)} | "
+            f"Cache: {contadores.get('cache.acertos', 0)}/"
+            f"{contadores.get('cache.acertos', 0) + contadores.get('cache.falhas', 0)}",
+        ]
+        
+        overlay_x, overlay_y = REGIAO_OVERLAY.topleft
+        pygame.draw.rect(self.screen, BLACK, (overlay_x, overlay_y, 460, 80), border_radius=5)
+        for i, linha in enumerate(linhas):
+            texto = self.renderizar_texto(self.font_mini, linha, LIGHT_GRAY)
+            self.screen.blit(texto, (overlay_x + 10, overlay_y + 8 + i * 22))
     
     def desenhar_botoes(self):
         if self.game.fase == "INICIO" or self.game.fase == "FIM":
             btn_nova = pygame.Rect(WIDTH//2 - 100, 730, 200, 50)
             pygame.draw.rect(self.screen, GREEN, btn_nova, border_radius=10)
             pygame.draw.rect(self.screen, WHITE, btn_nova, 3, border_radius=10)
-            text = self.font_medio.render("NOVA RODADA", True, WHITE)
+            text = self.renderizar_texto(self.font_medio, "NOVA RODADA", WHITE)
             self.screen.blit(text, (btn_nova.x + 20, btn_nova.y + 12))
         
         elif self.game.fase == "PRE_FLOP":
@@ -122,23 +257,25 @@ class GameInterface:
             
             pygame.draw.rect(self.screen, GREEN, btn_call, border_radius=10)
             pygame.draw.rect(self.screen, WHITE, btn_call, 3, border_radius=10)
-            text_call = self.font_medio.render("CALL", True, WHITE)
+            text_call = self.renderizar_texto(self.font_medio, "CALL", WHITE)
             self.screen.blit(text_call, (btn_call.x + 40, btn_call.y + 12))
             
             pygame.draw.rect(self.screen, RED, btn_fold, border_radius=10)
             pygame.draw.rect(self.screen, WHITE, btn_fold, 3, border_radius=10)
-            text_fold = self.font_medio.render("FOLD", True, WHITE)
+            text_fold = self.renderizar_texto(self.font_medio, "FOLD", WHITE)
             self.screen.blit(text_fold, (btn_fold.x + 40, btn_fold.y + 12))
         
         elif self.game.fase in ["FLOP", "TURN", "RIVER"]:
             btn_next = pygame.Rect(WIDTH//2 - 100, 730, 200, 50)
             pygame.draw.rect(self.screen, GREEN, btn_next, border_radius=10)
             pygame.draw.rect(self.screen, WHITE, btn_next, 3, border_radius=10)
-            text_next = self.font_medio.render("CONTINUAR", True, WHITE)
+            text_next = self.renderizar_texto(self.font_medio, "CONTINUAR", WHITE)
             self.screen.blit(text_next, (btn_next.x + 30, btn_next.y + 12))
     
     def desenhar_painel_stats(self):
-        if not self.game.stats or self.game.fase not in ["PRE_FLOP", "FLOP", "TURN", "RIVER"]:
+        if self.game.fase not in ["PRE_FLOP", "FLOP", "TURN", "RIVER"]:
+            return
+        if not self.game.stats and not self.game.calculando_stats():
             return
         
         # Painel
@@ -149,13 +286,19 @@ class GameInterface:
         pygame.draw.rect(self.screen, GOLD, (painel_x, painel_y, painel_w, painel_h), 3, border_radius=15)
         
         # Título
-        titulo = self.font_medio.render("ANÁLISE ESTATÍSTICA", True, GOLD)
+        titulo = self.renderizar_texto(self.font_medio, "ANÁLISE ESTATÍSTICA", GOLD)
         self.screen.blit(titulo, (painel_x + 30, painel_y + 15))
         
         y_offset = painel_y + 60
         
+        # Cálculo ainda em andamento na thread de stats
+        if not self.game.stats:
+            calc_text = self.renderizar_texto(self.font_pequeno, "Calculando...", LIGHT_GRAY)
+            self.screen.blit(calc_text, (painel_x + 20, y_offset))
+            return
+        
         # Mão Atual
-        mao_text = self.font_pequeno.render(f"Mão: {self.game.stats['tipo_mao']}", True, WHITE)
+        mao_text = self.renderizar_texto(self.font_pequeno, f"Mão: {self.game.stats['tipo_mao']}", WHITE)
         self.screen.blit(mao_text, (painel_x + 20, y_offset))
         y_offset += 40
         
@@ -169,7 +312,9 @@ class GameInterface:
         if vitoria > 0:
             largura_vitoria = int(320 * vitoria / 100)
             pygame.draw.rect(self.screen, GREEN, (painel_x + 20, y_offset, largura_vitoria, 30), border_radius=5)
-        text_v = self.font_mini.render(f"Vitória: {vitoria}%", True, WHITE)
+        margem = self.game.stats.get('margem')
+        texto_vitoria = f"Vitória: {vitoria}%" if margem is None else f"Vitória: {vitoria}% ±{margem:.1f}"
+        text_v = self.renderizar_texto(self.font_mini, texto_vitoria, WHITE)
         self.screen.blit(text_v, (painel_x + 30, y_offset + 5))
         y_offset += 40
         
@@ -178,7 +323,7 @@ class GameInterface:
         if empate > 0:
             largura_empate = int(320 * empate / 100)
             pygame.draw.rect(self.screen, GOLD, (painel_x + 20, y_offset, largura_empate, 30), border_radius=5)
-        text_e = self.font_mini.render(f"Empate: {empate}%", True, WHITE)
+        text_e = self.renderizar_texto(self.font_mini, f"Empate: {empate}%", WHITE)
         self.screen.blit(text_e, (painel_x + 30, y_offset + 5))
         y_offset += 40
         
@@ -187,14 +332,24 @@ class GameInterface:
         if derrota > 0:
             largura_derrota = int(320 * derrota / 100)
             pygame.draw.rect(self.screen, RED, (painel_x + 20, y_offset, largura_derrota, 30), border_radius=5)
-        text_d = self.font_mini.render(f"Derrota: {derrota}%", True, WHITE)
+        text_d = self.renderizar_texto(self.font_mini, f"Derrota: {derrota}%", WHITE)
         self.screen.blit(text_d, (painel_x + 30, y_offset + 5))
         y_offset += 50
         
         # Outs
-        outs_text = self.font_pequeno.render(f"Outs: {self.game.stats['outs']} cartas", True, WHITE)
+        outs = self.game.stats['outs']
+        outs_str = f"Outs: {outs} cartas" if outs is not None else "Outs: calculando..."
+        outs_text = self.renderizar_texto(self.font_pequeno, outs_str, WHITE)
         self.screen.blit(outs_text, (painel_x + 20, y_offset))
-        y_offset += 35
+        y_offset += 28
+        
+        # Outs por tipo de mão alcançada
+        outs_por_tipo = self.game.stats.get('outs_por_tipo')
+        if outs_por_tipo:
+            detalhe = ", ".join(f"{tipo}: {n}" for tipo, n in list(outs_por_tipo.items())[:3])
+            detalhe_text = self.renderizar_texto(self.font_mini, detalhe, LIGHT_GRAY)
+            self.screen.blit(detalhe_text, (painel_x + 20, y_offset))
+        y_offset += 27
         
         # Categoria de Força
         if vitoria >= 70:
@@ -210,13 +365,20 @@ class GameInterface:
             categoria = "FRACA"
             cor_cat = RED
         
-        cat_text = self.font_pequeno.render(f"Força: {categoria}", True, cor_cat)
+        cat_text = self.renderizar_texto(self.font_pequeno, f"Força: {categoria}", cor_cat)
         self.screen.blit(cat_text, (painel_x + 20, y_offset))
         y_offset += 40
         
         # Fase do Jogo
-        fase_text = self.font_mini.render(f"Fase: {self.game.fase}", True, LIGHT_GRAY)
+        fase_text = self.renderizar_texto(self.font_mini, f"Fase: {self.game.fase}", LIGHT_GRAY)
         self.screen.blit(fase_text, (painel_x + 20, y_offset))
+        
+        # Decisão ótima do pré-flop (FOLD vale -1 ante)
+        ev_call = self.game.stats.get('ev_call')
+        if ev_call is not None:
+            decisao = "CALL" if ev_call > -1 else "FOLD"
+            dica_text = self.renderizar_texto(self.font_mini, f"Ótimo: {decisao} (EV do call {ev_call:+.2f} ante)", GOLD)
+            self.screen.blit(dica_text, (painel_x + 20, y_offset + 25))
     
     def desenhar_historico(self):
         if not self.game.historico:
@@ -228,7 +390,7 @@ class GameInterface:
         pygame.draw.rect(self.screen, (20, 60, 20), (hist_x, hist_y, hist_w, hist_h), border_radius=10)
         pygame.draw.rect(self.screen, GOLD, (hist_x, hist_y, hist_w, hist_h), 2, border_radius=10)
         
-        titulo = self.font_texto.render("HISTÓRICO", True, GOLD)
+        titulo = self.renderizar_texto(self.font_texto, "HISTÓRICO", GOLD)
         self.screen.blit(titulo, (hist_x + 80, hist_y + 10))
         
         y_offset = hist_y + 45
@@ -239,11 +401,11 @@ class GameInterface:
             
             cor = GREEN if ganho > 0 else (WHITE if ganho == 0 else RED)
             
-            text_res = self.font_mini.render(resultado[:20], True, cor)
+            text_res = self.renderizar_texto(self.font_mini, resultado[:20], cor)
             self.screen.blit(text_res, (hist_x + 10, y_offset))
             
             ganho_str = f"+${ganho}" if ganho > 0 else f"${ganho}"
-            text_ganho = self.font_mini.render(ganho_str, True, cor)
+            text_ganho = self.renderizar_texto(self.font_mini, ganho_str, cor)
             self.screen.blit(text_ganho, (hist_x + hist_w - 70, y_offset))
             
             y_offset += 30
@@ -255,32 +417,44 @@ class GameInterface:
         
         taxa_vitoria = self.game.get_taxa_vitoria()
         
-        text_jogos = self.font_mini.render(f"Jogos: {self.game.total_jogos}", True, WHITE)
+        text_jogos = self.renderizar_texto(self.font_mini, f"Jogos: {self.game.total_jogos}", WHITE)
         self.screen.blit(text_jogos, (hist_x + 10, y_offset))
         y_offset += 25
         
-        text_taxa = self.font_mini.render(f"Taxa: {taxa_vitoria:.1f}%", True, GREEN if taxa_vitoria >= 50 else RED)
+        text_taxa = self.renderizar_texto(self.font_mini, f"Taxa: {taxa_vitoria:.1f}%", GREEN if taxa_vitoria >= 50 else RED)
         self.screen.blit(text_taxa, (hist_x + 10, y_offset))
     
     def processar_click(self, pos):
+        acao = self.acao_do_click(pos)
+        if acao is not None:
+            self.executar_acao(acao)
+    
+    def acao_do_click(self, pos):
+        # Ação do botão sob o clique na fase atual (as mesmas de session.ACOES)
         if self.game.fase == "INICIO" or self.game.fase == "FIM":
             btn_nova = pygame.Rect(WIDTH//2 - 100, 730, 200, 50)
             if btn_nova.collidepoint(pos):
-                self.game.iniciar_rodada()
+                return "nova_rodada"
         
         elif self.game.fase == "PRE_FLOP":
             btn_call = pygame.Rect(WIDTH//2 - 220, 730, 150, 50)
             btn_fold = pygame.Rect(WIDTH//2 + 70, 730, 150, 50)
             
             if btn_call.collidepoint(pos):
-                self.game.call()
+                return "call"
             elif btn_fold.collidepoint(pos):
-                self.game.fold()
+                return "fold"
         
         elif self.game.fase in ["FLOP", "TURN", "RIVER"]:
             btn_next = pygame.Rect(WIDTH//2 - 100, 730, 200, 50)
             if btn_next.collidepoint(pos):
-                self.game.call()
+                return "call"
+        return None
+    
+    def executar_acao(self, acao):
+        aplicar_acao(self.game, acao)
+        if self.gravador is not None:
+            self.gravador.registrar(acao, self.game)
     
     def get_clock(self):
         return self.clock
@@ -1,8 +1,17 @@
+import array
+import math
 import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from collections import Counter
 import itertools
 
+import instrumentation
+from random_streams import FluxoAleatorio
+from tables import carregar_tabela
+
 class Naipe(Enum):
     PAUS = "♣"
     OUROS = "♦"
@@ -26,44 +35,231 @@ class TipoMao(Enum):
     
     def __le__(self, other):
         return self.value[0] <= other.value[0]
-
+    
     def __gt__(self, other):
         return self.value[0] > other.value[0]
-
+    
     def __ge__(self, other):
         return self.value[0] >= other.value[0]
-
+    
     def __eq__(self, other):
         if isinstance(other, TipoMao):
             return self.value[0] == other.value[0]
         return False
 
+# Avaliador por tabela: cada carta contribui com 5^(valor-2) nos bits altos e
+# com 1 no nibble do seu naipe nos 16 bits baixos. A soma das chaves de até 7
+# cartas identifica o multiconjunto de valores e a contagem por naipe sem
+# colisões, então uma mão é avaliada com uma soma e uma consulta.
+_BITS_NAIPES = 16
+_INDICE_NAIPE = {naipe: i for i, naipe in enumerate(Naipe)}
+_DESLOCAMENTO_FLUSH = {0x8 << (4 * i): 13 * i for i in _INDICE_NAIPE.values()}
+_TIPOS = sorted(TipoMao, key=lambda t: t.value[0])
+
+def _chave_carta(valor_numerico, naipe):
+    return (5 ** (valor_numerico - 2) << _BITS_NAIPES) + (1 << (4 * _INDICE_NAIPE[naipe]))
+
 class Carta:
+    __slots__ = ('valor', 'naipe', 'valor_numerico', 'indice', 'bit', 'chave')
     VALORES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+    _internadas = {}
+    
+    def __new__(cls, valor, naipe):
+        # Cartas são internadas: cada (valor, naipe) existe uma única vez
+        carta = cls._internadas.get((valor, naipe))
+        if carta is None:
+            carta = super().__new__(cls)
+            carta.valor = valor
+            carta.naipe = naipe
+            carta.valor_numerico = cls.VALORES.index(valor) + 2
+            carta.indice = _INDICE_NAIPE[naipe] * 13 + carta.valor_numerico - 2
+            carta.bit = 1 << carta.indice
+            carta.chave = _chave_carta(carta.valor_numerico, naipe)
+            cls._internadas[(valor, naipe)] = carta
+        return carta
     
-    def __init__(self, valor, naipe):
-        self.valor = valor
-        self.naipe = naipe
-        self.valor_numerico = self.VALORES.index(valor) + 2
+    def __reduce__(self):
+        return (Carta, (self.valor, self.naipe))
     
     def __repr__(self):
         return f"{self.valor}{self.naipe.value}"
+    
+    @staticmethod
+    def de_indice(indice):
+        return BARALHO_COMPLETO[indice]
+
+# Índice da carta = naipe * 13 + (valor - 2); conjuntos de cartas são máscaras de 52 bits
+BARALHO_COMPLETO = tuple(Carta(valor, naipe) for naipe in Naipe for valor in Carta.VALORES)
+MASCARA_COMPLETA = (1 << 52) - 1
+_CHAVES = [carta.chave for carta in BARALHO_COMPLETO]
+
+def mascara_cartas(cartas):
+    bits = 0
+    for carta in cartas:
+        bits |= carta.bit
+    return bits
+
+def indices_mascara(mascara):
+    return [i for i in range(52) if mascara >> i & 1]
+
+def forma_canonica(mao_jogador, cartas_comunitarias):
+    # Situações que diferem só por uma troca de naipes têm a mesma equity. Cada
+    # naipe vira o par (valores na mão, valores na mesa); ordenando os naipes por
+    # esse par, todas as situações isomorfas chegam às mesmas máscaras.
+    mascara_mao = mascara_cartas(mao_jogador)
+    mascara_mesa = mascara_cartas(cartas_comunitarias)
+    naipes = sorted((((mascara_mao >> 13 * n) & 0x1FFF, (mascara_mesa >> 13 * n) & 0x1FFF) for n in range(4)),
+                    reverse=True)
+    mao = mesa = 0
+    for n, (valores_mao, valores_mesa) in enumerate(naipes):
+        mao |= valores_mao << 13 * n
+        mesa |= valores_mesa << 13 * n
+    return mao, mesa
 
 class Baralho:
-    def __init__(self):
-        self.cartas = [Carta(valor, naipe) for naipe in Naipe for valor in Carta.VALORES]
-        self.embaralhar()
+    # Um único array de 52 cartas reaproveitado entre as rodadas: as cartas são
+    # sorteadas uma a uma (Fisher-Yates parcial), então dar k cartas custa k
+    # sorteios. cartas[:dadas] são as já dadas; embaralhar() só recolhe as cartas.
+    def __init__(self, rng=None):
+        # rng: qualquer objeto com random() (módulo random, random.Random, FluxoAleatorio)
+        self.rng = rng if rng is not None else random
+        self.cartas = list(BARALHO_COMPLETO)
+        self.dadas = 0
     
     def embaralhar(self):
-        random.shuffle(self.cartas)
+        self.dadas = 0
     
     def dar_carta(self):
-        if len(self.cartas) == 0:
+        dadas = self.dadas
+        if dadas == 52:
             return None
-        return self.cartas.pop()
+        cartas = self.cartas
+        sorteada = dadas + int(self.rng.random() * (52 - dadas))
+        cartas[dadas], cartas[sorteada] = cartas[sorteada], cartas[dadas]
+        self.dadas = dadas + 1
+        return cartas[dadas]
+    
+    def dar_cartas(self, quantidade):
+        return [self.dar_carta() for _ in range(quantidade)]
     
     def cartas_restantes(self):
-        return len(self.cartas)
+        return 52 - self.dadas
+
+def _codificar_forca(tipo, valores):
+    # Força = tipo nos bits 20+ e os 5 valores em nibbles, do mais ao menos relevante
+    forca = tipo.value[0]
+    for v in valores:
+        forca = (forca << 4) | v
+    return forca
+
+def _maior_sequencia(bits_valores):
+    for alta in range(12, 3, -1):
+        mascara = 0x1F << (alta - 4)
+        if bits_valores & mascara == mascara:
+            return [alta + 2 - i for i in range(5)]
+    if bits_valores & 0x100F == 0x100F:
+        return [5, 4, 3, 2, 14]
+    return None
+
+def _melhor_mao_sem_flush(contagem):
+    presentes = sorted(contagem, reverse=True)
+    quadras = [v for v in presentes if contagem[v] == 4]
+    trincas = [v for v in presentes if contagem[v] == 3]
+    pares = [v for v in presentes if contagem[v] == 2]
+    
+    if quadras:
+        q = quadras[0]
+        return TipoMao.QUADRA, [q] * 4 + [v for v in presentes if v != q][:1]
+    if trincas and (len(trincas) > 1 or pares):
+        t = trincas[0]
+        p = max(trincas[1:] + pares)
+        return TipoMao.FULL_HOUSE, [t] * 3 + [p] * 2
+    
+    sequencia = _maior_sequencia(sum(1 << (v - 2) for v in presentes))
+    if sequencia:
+        return TipoMao.SEQUENCIA, sequencia
+    
+    if trincas:
+        t = trincas[0]
+        return TipoMao.TRINCA, [t] * 3 + [v for v in presentes if v != t][:2]
+    if len(pares) >= 2:
+        p1, p2 = pares[:2]
+        return TipoMao.DOIS_PARES, [p1, p1, p2, p2] + [v for v in presentes if v not in (p1, p2)][:1]
+    if pares:
+        p = pares[0]
+        return TipoMao.PAR, [p, p] + [v for v in presentes if v != p][:3]
+    return TipoMao.CARTA_ALTA, presentes[:5]
+
+def _construir_tabela_valores():
+    # Percorre todos os multiconjuntos de 5 a 7 valores (no máximo 4 de cada)
+    tabela = {}
+    pendentes = [(14, 0, 0, {})]
+    while pendentes:
+        valor, total, chave, contagem = pendentes.pop()
+        if valor < 2:
+            if total >= 5:
+                tabela[chave] = _codificar_forca(*_melhor_mao_sem_flush(contagem))
+            continue
+        pendentes.append((valor - 1, total, chave, contagem))
+        for n in range(1, min(4, 7 - total) + 1):
+            pendentes.append((valor - 1, total + n, chave + n * 5 ** (valor - 2), {**contagem, valor: n}))
+    return tabela
+
+def _construir_tabela_flush():
+    tabela = [0] * (1 << 13)
+    for bits in range(1 << 13):
+        if bin(bits).count("1") < 5:
+            continue
+        sequencia = _maior_sequencia(bits)
+        if sequencia:
+            tipo = TipoMao.ROYAL_FLUSH if sequencia[0] == 14 else TipoMao.STRAIGHT_FLUSH
+            tabela[bits] = _codificar_forca(tipo, sequencia)
+        else:
+            valores = [v for v in range(14, 1, -1) if bits >> (v - 2) & 1][:5]
+            tabela[bits] = _codificar_forca(TipoMao.FLUSH, valores)
+    return tabela
+
+def _construir_tabelas_avaliador():
+    valores = _construir_tabela_valores()
+    chaves = sorted(valores)
+    return [array.array("q", chaves), array.array("i", [valores[c] for c in chaves]),
+            array.array("i", _construir_tabela_flush())]
+
+class _TabelaSobDemanda(dict):
+    # Preenchida na primeira consulta que falha: importar o game_logic não lê nem
+    # constrói as tabelas do avaliador, só avaliar uma mão. Depois de carregada,
+    # a consulta é a de um dict comum.
+    def __missing__(self, chave):
+        tabelas_avaliador()
+        valor = self.get(chave)
+        if valor is None:
+            raise KeyError(chave)
+        return valor
+
+# As tabelas do avaliador vêm do disco (construídas só na primeira execução);
+# mudou a codificação das forças, suba VERSAO_TABELAS_AVALIADOR
+VERSAO_TABELAS_AVALIADOR = 1
+_POTENCIAS_5 = [5 ** v for v in range(13)]
+_FORCA_VALORES = _TabelaSobDemanda()
+_FORCA_FLUSH = _TabelaSobDemanda()
+_tabelas_avaliador = None
+_trava_tabelas = threading.Lock()
+
+def tabelas_avaliador():
+    # (chaves de valores, forças sem flush, forças de flush) como array.array,
+    # carregadas uma única vez (a thread de stats pode chegar junto com a principal)
+    global _tabelas_avaliador
+    with _trava_tabelas:
+        if _tabelas_avaliador is None:
+            chaves, forcas, forcas_flush = carregar_tabela("avaliador", VERSAO_TABELAS_AVALIADOR,
+                                                           _construir_tabelas_avaliador)
+            _FORCA_VALORES.update(zip(chaves, forcas))
+            _FORCA_FLUSH.update(enumerate(forcas_flush))
+            _tabelas_avaliador = (chaves, forcas, forcas_flush)
+    return _tabelas_avaliador
+
+# Dealer qualifica com par de 4s ou melhor
+FORCA_QUALIFICACAO_DEALER = _codificar_forca(TipoMao.PAR, [4, 4, 0, 0, 0])
 
 class AvaliadorMao:
     @staticmethod
@@ -72,99 +268,253 @@ class AvaliadorMao:
             cartas_ordenadas = sorted(cartas, key=lambda x: x.valor_numerico, reverse=True)
             return (TipoMao.CARTA_ALTA, [c.valor_numerico for c in cartas_ordenadas])
         
-        melhor_mao = None
-        melhor_tipo = TipoMao.CARTA_ALTA
+        return AvaliadorMao.decodificar(AvaliadorMao.forca(cartas))
+    
+    @staticmethod
+    def forca(cartas):
+        # Inteiro comparável da melhor mão de 5 a 7 cartas
+        chave = 0
+        for carta in cartas:
+            chave += carta.chave
         
-        for combinacao in itertools.combinations(cartas, 5):
-            tipo, valores = AvaliadorMao._avaliar_5_cartas(list(combinacao))
-            if tipo > melhor_tipo or (tipo == melhor_tipo and valores > (melhor_mao[1] if melhor_mao else [])):
-                melhor_tipo = tipo
-                melhor_mao = (tipo, valores)
+        flush = (chave + 0x3333) & 0x8888
+        if flush:
+            return _FORCA_FLUSH[(mascara_cartas(cartas) >> _DESLOCAMENTO_FLUSH[flush]) & 0x1FFF]
         
-        return melhor_mao
+        return _FORCA_VALORES[chave >> _BITS_NAIPES]
     
     @staticmethod
-    def _avaliar_5_cartas(cartas):
-        valores = sorted([c.valor_numerico for c in cartas], reverse=True)
-        naipes = [c.naipe for c in cartas]
-        contagem_valores = Counter(valores)
-        contagem_naipes = Counter(naipes)
-        
-        is_flush = len(contagem_naipes) == 1
-        is_straight = AvaliadorMao._is_sequencia(valores)
-        
-        if is_straight and is_flush:
-            if valores[0] == 14:
-                return (TipoMao.ROYAL_FLUSH, valores)
-            return (TipoMao.STRAIGHT_FLUSH, valores)
-        
-        contagens = sorted(contagem_valores.values(), reverse=True)
-        
-        if contagens[0] == 4:
-            return (TipoMao.QUADRA, valores)
-        if contagens[0] == 3 and contagens[1] == 2:
-            return (TipoMao.FULL_HOUSE, valores)
-        if is_flush:
-            return (TipoMao.FLUSH, valores)
-        if is_straight:
-            return (TipoMao.SEQUENCIA, valores)
-        if contagens[0] == 3:
-            return (TipoMao.TRINCA, valores)
-        if contagens[0] == 2 and contagens[1] == 2:
-            return (TipoMao.DOIS_PARES, valores)
-        if contagens[0] == 2:
-            return (TipoMao.PAR, valores)
-        
-        return (TipoMao.CARTA_ALTA, valores)
+    def forca_chave(chave, bits):
+        # A partir da soma das chaves e da máscara das cartas, já acumuladas pelo chamador
+        flush = (chave + 0x3333) & 0x8888
+        if flush:
+            return _FORCA_FLUSH[(bits >> _DESLOCAMENTO_FLUSH[flush]) & 0x1FFF]
+        return _FORCA_VALORES[chave >> _BITS_NAIPES]
     
     @staticmethod
-    def _is_sequencia(valores):
-        if valores == [14, 5, 4, 3, 2]:
-            return True
-        for i in range(len(valores) - 1):
-            if valores[i] - valores[i+1] != 1:
-                return False
-        return True
+    def forca_indices(indices):
+        chave = 0
+        for i in indices:
+            chave += _CHAVES[i]
+        
+        flush = (chave + 0x3333) & 0x8888
+        if flush:
+            bits = 0
+            for i in indices:
+                bits |= 1 << i
+            return _FORCA_FLUSH[(bits >> _DESLOCAMENTO_FLUSH[flush]) & 0x1FFF]
+        
+        return _FORCA_VALORES[chave >> _BITS_NAIPES]
+    
+    @staticmethod
+    def tipo(forca):
+        return _TIPOS[forca >> 20]
+    
+    @staticmethod
+    def decodificar(forca):
+        return (_TIPOS[forca >> 20], [(forca >> s) & 0xF for s in (16, 12, 8, 4, 0)])
 
 class CalculadorProbabilidades:
+    # Cache opcional de resultados (equity_cache.ativar_cache); None = sem cache
+    cache = None
+    
     @staticmethod
-    def calcular_equity(mao_jogador, cartas_comunitarias, num_simulacoes=1000):
+    def calcular_equity(mao_jogador, cartas_comunitarias, num_simulacoes=1000, vetorizado=False, exato=None,
+                        workers=None, semente=None, tolerancia=None, tempo_maximo=None, cancelado=None):
         if not mao_jogador or len(mao_jogador) == 0:
             return {'vitoria': 0, 'empate': 0, 'derrota': 100}
         
-        cartas_conhecidas = mao_jogador + cartas_comunitarias
-        baralho_restante = [Carta(v, n) for n in Naipe for v in Carta.VALORES 
-                           if not any(c.valor == v and c.naipe == n for c in cartas_conhecidas)]
+        # Pré-flop com 2 cartas: consulta a tabela exata pré-computada, se existir
+        if not cartas_comunitarias and len(mao_jogador) == 2 and exato is not False:
+            resultado = CalculadorProbabilidades.equity_preflop(mao_jogador)
+            if resultado:
+                return resultado
+        
+        # Automático: no turn e no river a enumeração completa é mais barata que a amostragem
+        if exato is None:
+            exato = len(cartas_comunitarias) >= 4
+        
+        # Com semente o resultado deve ser reprodutível: não passa pelo cache
+        # Modo do cálculo na chave: 0 = exato, positivo = simulações fixas,
+        # negativo = adaptativo (tolerância em milésimos de ponto percentual)
+        cache = CalculadorProbabilidades.cache
+        if cache is not None and semente is None:
+            if exato:
+                modo = 0
+            elif tolerancia is not None:
+                modo = -max(1, round(tolerancia * 1000))
+            else:
+                modo = num_simulacoes
+            chave = forma_canonica(mao_jogador, cartas_comunitarias) + (modo,)
+            resultado = cache.obter(chave)
+            if resultado is None:
+                resultado = CalculadorProbabilidades._calcular_equity(mao_jogador, cartas_comunitarias, num_simulacoes,
+                                                                      vetorizado, exato, workers, semente,
+                                                                      tolerancia, tempo_maximo, cancelado)
+                # Adaptativo que parou antes da tolerância (tempo_maximo ou cancelado) não
+                # vale para quem pedir outro orçamento de tempo: não entra no cache
+                if modo >= 0 or resultado.get('margem', 0) <= tolerancia:
+                    cache.guardar(chave, resultado)
+            return dict(resultado)
+        
+        return CalculadorProbabilidades._calcular_equity(mao_jogador, cartas_comunitarias, num_simulacoes,
+                                                         vetorizado, exato, workers, semente, tolerancia, tempo_maximo,
+                                                         cancelado)
+    
+    @staticmethod
+    def _calcular_equity(mao_jogador, cartas_comunitarias, num_simulacoes, vetorizado, exato, workers, semente,
+                         tolerancia, tempo_maximo, cancelado=None):
+        if tolerancia is not None and not exato:
+            return CalculadorProbabilidades.calcular_equity_adaptativa(
+                mao_jogador, cartas_comunitarias, tolerancia, tempo_maximo, vetorizado=vetorizado, semente=semente,
+                cancelado=cancelado
+            )
         
-        if len(baralho_restante) < 7:
+        if workers and workers > 1:
+            if not exato:
+                instrumentation.contar("equity.simulacoes", num_simulacoes)
+            from parallel import calcular_equity_paralela
+            return calcular_equity_paralela(mao_jogador, cartas_comunitarias, num_simulacoes, workers,
+                                            exato=exato, vetorizado=vetorizado, semente=semente)
+        
+        if exato:
+            return CalculadorProbabilidades.calcular_equity_exata(mao_jogador, cartas_comunitarias)
+        
+        instrumentation.contar("equity.simulacoes", num_simulacoes)
+        if vetorizado:
+            # Modo em lote com NumPy, importado só quando usado
+            from batch_eval import calcular_equity_lote
+            return calcular_equity_lote(mao_jogador, cartas_comunitarias, num_simulacoes, semente=semente)
+        
+        if 52 - len(mao_jogador) - len(cartas_comunitarias) < 7:
             return {'vitoria': 50, 'empate': 10, 'derrota': 40}
         
+        rng = random if semente is None else FluxoAleatorio(semente)
+        return CalculadorProbabilidades._percentuais(*CalculadorProbabilidades._contar_simulacoes(
+            [c.indice for c in mao_jogador], [c.indice for c in cartas_comunitarias], num_simulacoes, rng
+        ))
+    
+    @staticmethod
+    def calcular_equity_ranges(ranges, cartas_comunitarias=(), exato=None, num_boards=2000, semente=None,
+                               workers=None):
+        # Equity entre ranges ("top 20%", "AA,KK", mãos exatas); requer NumPy
+        from ranges import equity_ranges
+        return equity_ranges(ranges, cartas_comunitarias, exato, num_boards, semente=semente, workers=workers)
+    
+    @staticmethod
+    def calcular_equity_oponentes(mao_jogador, cartas_comunitarias, num_oponentes=1, range_oponentes="aleatoria",
+                                  num_boards=2000, semente=None, workers=None):
+        # Equity da mão contra N oponentes com o mesmo range; 'equity' divide os potes empatados
+        from ranges import equity_ranges
+        resultado = equity_ranges([mao_jogador] + [range_oponentes] * num_oponentes, cartas_comunitarias,
+                                  num_boards=num_boards, semente=semente, workers=workers)
+        return resultado['jogadores'][0]
+    
+    @staticmethod
+    def equity_preflop(mao_jogador):
+        from preflop_table import carregar_tabela_preflop
+        tabela = carregar_tabela_preflop()
+        return tabela.equity(mao_jogador) if tabela else None
+    
+    @staticmethod
+    def _contar_simulacoes(indices_jogador, indices_mesa, num_simulacoes, rng):
+        baralho_restante = indices_mascara(MASCARA_COMPLETA & ~sum(1 << i for i in indices_jogador + indices_mesa))
+        
         vitorias = empates = derrotas = 0
-        cartas_faltantes = 5 - len(cartas_comunitarias)
+        cartas_faltantes = 5 - len(indices_mesa)
+        
+        # Garantir que temos cartas suficientes
+        num_sorteadas = cartas_faltantes + 2
+        tamanho = len(baralho_restante)
+        if tamanho < num_sorteadas:
+            return 0, 0, 0
         
+        # Fisher-Yates parcial: só as cartas do runout e do dealer são sorteadas
+        aleatorio = rng.random
         for _ in range(num_simulacoes):
-            random.shuffle(baralho_restante)
+            for j in range(num_sorteadas):
+                k = j + int(aleatorio() * (tamanho - j))
+                baralho_restante[j], baralho_restante[k] = baralho_restante[k], baralho_restante[j]
             
-            # Garantir que temos cartas suficientes
-            if len(baralho_restante) < cartas_faltantes + 2:
-                continue
-            
-            cartas_simuladas = cartas_comunitarias + baralho_restante[:cartas_faltantes]
+            cartas_simuladas = indices_mesa + baralho_restante[:cartas_faltantes]
             mao_dealer = baralho_restante[cartas_faltantes:cartas_faltantes+2]
             
-            mao_jogador_completa = mao_jogador + cartas_simuladas
-            mao_dealer_completa = mao_dealer + cartas_simuladas
-            
-            tipo_jogador, valores_jogador = AvaliadorMao.avaliar_mao(mao_jogador_completa)
-            tipo_dealer, valores_dealer = AvaliadorMao.avaliar_mao(mao_dealer_completa)
+            forca_jogador = AvaliadorMao.forca_indices(indices_jogador + cartas_simuladas)
+            forca_dealer = AvaliadorMao.forca_indices(mao_dealer + cartas_simuladas)
             
-            if tipo_jogador > tipo_dealer or (tipo_jogador == tipo_dealer and valores_jogador > valores_dealer):
+            if forca_jogador > forca_dealer:
                 vitorias += 1
-            elif tipo_jogador == tipo_dealer and valores_jogador == valores_dealer:
+            elif forca_jogador == forca_dealer:
                 empates += 1
             else:
                 derrotas += 1
         
+        return vitorias, empates, derrotas
+    
+    @staticmethod
+    def calcular_equity_adaptativa(mao_jogador, cartas_comunitarias, tolerancia=1.0, tempo_maximo=None,
+                                   confianca=0.95, tamanho_lote=None, max_simulacoes=None, vetorizado=False,
+                                   semente=None, cancelado=None):
+        # Simula em lotes até a meia-largura do intervalo de confiança da % de
+        # vitória ficar abaixo da tolerância (em pontos percentuais) ou o tempo acabar.
+        # cancelado(), consultado entre os lotes, interrompe um cálculo que ficou obsoleto.
+        if not mao_jogador:
+            return {'vitoria': 0, 'empate': 0, 'derrota': 100}
+        if 52 - len(mao_jogador) - len(cartas_comunitarias) < 7:
+            return {'vitoria': 50, 'empate': 10, 'derrota': 40}
+        
+        indices_jogador = [c.indice for c in mao_jogador]
+        indices_mesa = [c.indice for c in cartas_comunitarias]
+        if vetorizado:
+            import numpy as np
+            from batch_eval import contar_resultados_lote as contar
+            rng = np.random.default_rng(semente)
+            tamanho_lote = tamanho_lote or 20000
+        else:
+            contar = CalculadorProbabilidades._contar_simulacoes
+            rng = random if semente is None else FluxoAleatorio(semente)
+            tamanho_lote = tamanho_lote or 250
+        
+        z = statistics.NormalDist().inv_cdf(0.5 + confianca / 2)
+        inicio = time.perf_counter()
+        vitorias = empates = derrotas = 0
+        while True:
+            v, e, d = contar(indices_jogador, indices_mesa, tamanho_lote, rng)
+            vitorias += v
+            empates += e
+            derrotas += d
+            total = vitorias + empates + derrotas
+            inferior, superior = CalculadorProbabilidades.intervalo_wilson(vitorias, total, z)
+            # Pelo menos dois lotes, para o intervalo não fechar cedo demais em spots extremos
+            if total >= 2 * tamanho_lote and (superior - inferior) * 50 <= tolerancia:
+                break
+            if tempo_maximo is not None and time.perf_counter() - inicio >= tempo_maximo:
+                break
+            if max_simulacoes is not None and total + tamanho_lote > max_simulacoes:
+                break
+            if cancelado is not None and cancelado():
+                break
+        
+        instrumentation.contar("equity.simulacoes", total)
+        resultado = CalculadorProbabilidades._percentuais(vitorias, empates, derrotas)
+        resultado['intervalo'] = (round(inferior * 100, 1), round(superior * 100, 1))
+        resultado['margem'] = round((superior - inferior) * 50, 2)
+        resultado['simulacoes'] = total
+        return resultado
+    
+    @staticmethod
+    def intervalo_wilson(sucessos, total, z=1.96):
+        # Intervalo de Wilson para uma proporção: não degenera perto de 0% e 100%
+        if total == 0:
+            return 0.0, 1.0
+        p = sucessos / total
+        z2 = z * z / total
+        centro = (p + z2 / 2) / (1 + z2)
+        meia_largura = z * math.sqrt(p * (1 - p) / total + z2 / (4 * total)) / (1 + z2)
+        return max(0.0, centro - meia_largura), min(1.0, centro + meia_largura)
+    
+    @staticmethod
+    def _percentuais(vitorias, empates, derrotas):
         total = vitorias + empates + derrotas
         if total == 0:
             return {'vitoria': 33.3, 'empate': 33.3, 'derrota': 33.4}
@@ -176,38 +526,231 @@ class CalculadorProbabilidades:
         }
     
     @staticmethod
-    def calcular_outs(mao_jogador, cartas_comunitarias):
-        if len(cartas_comunitarias) >= 5 or not mao_jogador:
-            return 0
+    def runouts(indices_jogador, indices_mesa):
+        baralho_restante = indices_mascara(MASCARA_COMPLETA & ~sum(1 << i for i in indices_jogador + indices_mesa))
+        return itertools.combinations(baralho_restante, 5 - len(indices_mesa))
+    
+    @staticmethod
+    def calcular_equity_exata(mao_jogador, cartas_comunitarias):
+        # Enumera todos os runouts e todas as mãos do dealer
+        if not mao_jogador:
+            return {'vitoria': 0, 'empate': 0, 'derrota': 100}
         
+        indices_jogador = [c.indice for c in mao_jogador]
+        indices_mesa = [c.indice for c in cartas_comunitarias]
+        runouts = CalculadorProbabilidades.runouts(indices_jogador, indices_mesa)
+        resultado = CalculadorProbabilidades._contar_runouts(indices_jogador, indices_mesa, runouts)
+        instrumentation.contar("equity.casos_exatos", sum(resultado))
+        return CalculadorProbabilidades._percentuais(*resultado)
+    
+    @staticmethod
+    def _contar_runouts(indices_jogador, indices_mesa, runouts):
+        baralho_restante = indices_mascara(MASCARA_COMPLETA & ~sum(1 << i for i in indices_jogador + indices_mesa))
+        
+        vitorias = empates = derrotas = 0
+        for runout in runouts:
+            mesa = indices_mesa + list(runout)
+            disponiveis = [i for i in baralho_restante if i not in runout]
+            v, e, d = CalculadorProbabilidades._contar_maos_dealer(
+                mesa, disponiveis, AvaliadorMao.forca_indices(indices_jogador + mesa)
+            )
+            vitorias += v
+            empates += e
+            derrotas += d
+        
+        return vitorias, empates, derrotas
+    
+    @staticmethod
+    def _contar_maos_dealer(mesa, disponiveis, forca_jogador):
+        # Compara forca_jogador com todas as mãos de 2 cartas do dealer em uma mesa
+        # completa. Sem flush possível a força só depende dos valores, então as
+        # mãos são agrupadas pelos 91 pares de valores; só os pares que podem
+        # fazer flush são avaliados um a um.
+        resultado = [0, 0, 0]
+        
+        def marcar(forca, n):
+            if forca_jogador > forca:
+                resultado[0] += n
+            elif forca_jogador == forca:
+                resultado[1] += n
+            else:
+                resultado[2] += n
+        
+        chave_mesa = bits_mesa = 0
+        for i in mesa:
+            chave_mesa += _CHAVES[i]
+            bits_mesa |= 1 << i
+        chave_valores = chave_mesa >> _BITS_NAIPES
+        
+        def agregar(cartas):
+            contagem = [0] * 13
+            for i in cartas:
+                contagem[i % 13] += 1
+            for v1 in range(13):
+                n1 = contagem[v1]
+                if not n1:
+                    continue
+                if n1 > 1:
+                    marcar(_FORCA_VALORES[chave_valores + 2 * _POTENCIAS_5[v1]], n1 * (n1 - 1) // 2)
+                for v2 in range(v1 + 1, 13):
+                    if contagem[v2]:
+                        marcar(_FORCA_VALORES[chave_valores + _POTENCIAS_5[v1] + _POTENCIAS_5[v2]], n1 * contagem[v2])
+        
+        # Numa mesa de 5 cartas no máximo um naipe tem 3 ou mais
+        naipe = next((n for n in range(4) if (chave_mesa >> (4 * n)) & 0xF >= 3), None)
+        if naipe is None:
+            agregar(disponiveis)
+            return resultado
+        
+        deslocamento = 13 * naipe
+        no_naipe = [i for i in disponiveis if i // 13 == naipe]
+        fora = [i for i in disponiveis if i // 13 != naipe]
+        no_naipe_mesa = (chave_mesa >> (4 * naipe)) & 0xF
+        
+        if no_naipe_mesa == 3:
+            # Só pares com as duas cartas do naipe fazem flush: corrige essas mãos
+            agregar(disponiveis)
+            for a, b in itertools.combinations(no_naipe, 2):
+                marcar(_FORCA_VALORES[chave_valores + _POTENCIAS_5[a % 13] + _POTENCIAS_5[b % 13]], -1)
+                marcar(_FORCA_FLUSH[((bits_mesa | 1 << a | 1 << b) >> deslocamento) & 0x1FFF], 1)
+            return resultado
+        
+        if no_naipe_mesa == 4:
+            agregar(fora)
+        else:
+            # Flush na mesa: o dealer sem cartas do naipe joga o flush da mesa
+            n = len(fora)
+            marcar(_FORCA_FLUSH[(bits_mesa >> deslocamento) & 0x1FFF], n * (n - 1) // 2)
+        for a, b in itertools.chain(itertools.combinations(no_naipe, 2), itertools.product(no_naipe, fora)):
+            marcar(_FORCA_FLUSH[((bits_mesa | 1 << a | 1 << b) >> deslocamento) & 0x1FFF], 1)
+        return resultado
+    
+    @staticmethod
+    def calcular_outs(mao_jogador, cartas_comunitarias):
+        return sum(CalculadorProbabilidades.calcular_outs_por_tipo(mao_jogador, cartas_comunitarias).values())
+    
+    @staticmethod
+    def calcular_outs_por_tipo(mao_jogador, cartas_comunitarias):
+        # Outs agrupados pelo tipo de mão que alcançam, do melhor para o pior.
+        # A soma das chaves das cartas conhecidas já é o histograma de valores e
+        # naipes: cada candidata só soma a sua chave. Sem flush, a força depende
+        # apenas do valor da candidata, então são no máximo 13 consultas à tabela.
         cartas_conhecidas = mao_jogador + cartas_comunitarias
+        if len(cartas_comunitarias) >= 5 or not mao_jogador or len(cartas_conhecidas) < 4:
+            return {}
+        
+        chave = 0
+        for carta in cartas_conhecidas:
+            chave += carta.chave
+        conhecidas = mascara_cartas(cartas_conhecidas)
         
         if len(cartas_conhecidas) < 5:
-            tipo_atual = TipoMao.CARTA_ALTA
+            tipo_atual = TipoMao.CARTA_ALTA.value[0]
         else:
-            tipo_atual, _ = AvaliadorMao.avaliar_mao(cartas_conhecidas)
+            tipo_atual = AvaliadorMao.forca(cartas_conhecidas) >> 20
         
-        baralho_restante = [Carta(v, n) for n in Naipe for v in Carta.VALORES 
-                           if not any(c.valor == v and c.naipe == n for c in cartas_conhecidas)]
+        tipos_sem_flush = [None] * 13
+        contagem = [0] * len(_TIPOS)
+        candidatas = indices_mascara(MASCARA_COMPLETA & ~conhecidas)
+        instrumentation.contar("outs.candidatas", len(candidatas))
+        for i in candidatas:
+            nova_chave = chave + _CHAVES[i]
+            flush = (nova_chave + 0x3333) & 0x8888
+            if flush:
+                novo_tipo = _FORCA_FLUSH[((conhecidas | 1 << i) >> _DESLOCAMENTO_FLUSH[flush]) & 0x1FFF] >> 20
+            else:
+                valor = i % 13
+                if tipos_sem_flush[valor] is None:
+                    tipos_sem_flush[valor] = _FORCA_VALORES[nova_chave >> _BITS_NAIPES] >> 20
+                novo_tipo = tipos_sem_flush[valor]
+            if novo_tipo > tipo_atual:
+                contagem[novo_tipo] += 1
         
-        outs = 0
-        for carta in baralho_restante:
-            novas_cartas = cartas_conhecidas + [carta]
-            if len(novas_cartas) >= 5:
-                novo_tipo, _ = AvaliadorMao.avaliar_mao(novas_cartas)
-                if novo_tipo > tipo_atual:
-                    outs += 1
+        return {_TIPOS[t].value[1]: contagem[t] for t in range(len(_TIPOS) - 1, -1, -1) if contagem[t]}
+
+class RastreadorEquity:
+    # Equity de uma rodada acompanhada street a street. No flop, com as stats já
+    # publicadas, preparar() conta na thread de stats as vitórias, empates e
+    # derrotas de cada um dos 1081 runouts (turn + river) contra todas as mãos do
+    # dealer. O turn só consulta os 46 runouts com a carta revelada e descarta o
+    # resto; o river fica com um só, sem reavaliar nada. Runouts que a preparação
+    # não chegou a contar (cancelada ou não feita) são enumerados na hora.
+    def __init__(self, mao_jogador):
+        self.indices_jogador = [c.indice for c in mao_jogador]
+        self.flop = None
+        # Máscara das cartas depois do flop -> (vitórias, empates, derrotas)
+        self.runouts = {}
+        # Streets podem ser pedidas por threads diferentes (executor compartilhado):
+        # a do turn espera a preparação (que para quando a street muda) e aproveita o que foi contado
+        self._trava = threading.Lock()
+    
+    def _usar_flop(self, indices_mesa):
+        if indices_mesa[:3] != self.flop:
+            self.flop = indices_mesa[:3]
+            self.runouts = {}
+    
+    def _contar(self, runout):
+        resultado = CalculadorProbabilidades._contar_runouts(self.indices_jogador, self.flop, [runout])
+        instrumentation.contar("equity.casos_exatos", sum(resultado))
+        return resultado
+    
+    def preparar(self, cartas_comunitarias, cancelado=None):
+        if len(cartas_comunitarias) != 3:
+            return False
         
-        return outs
+        indices_mesa = [c.indice for c in cartas_comunitarias]
+        with self._trava:
+            self._usar_flop(indices_mesa)
+            for runout in CalculadorProbabilidades.runouts(self.indices_jogador, indices_mesa):
+                if cancelado is not None and cancelado():
+                    return False
+                mascara = sum(1 << i for i in runout)
+                if mascara not in self.runouts:
+                    self.runouts[mascara] = self._contar(runout)
+        return True
+    
+    def equity(self, cartas_comunitarias):
+        if len(cartas_comunitarias) < 4:
+            return None
+        
+        indices_mesa = [c.indice for c in cartas_comunitarias]
+        reveladas = indices_mesa[3:]
+        mascara_reveladas = sum(1 << i for i in reveladas)
+        with self._trava:
+            self._usar_flop(indices_mesa)
+            restantes = {}
+            for runout in CalculadorProbabilidades.runouts(self.indices_jogador, indices_mesa):
+                mascara = mascara_reveladas | sum(1 << i for i in runout)
+                resultado = self.runouts.get(mascara)
+                if resultado is None:
+                    resultado = self._contar(reveladas + list(runout))
+                restantes[mascara] = resultado
+            self.runouts = restantes
+        
+        vitorias = empates = derrotas = 0
+        for v, e, d in restantes.values():
+            vitorias += v
+            empates += e
+            derrotas += d
+        return CalculadorProbabilidades._percentuais(vitorias, empates, derrotas)
+
+# Precisão das stats no flop: meia-largura do IC de 95% da % de vitória, em
+# pontos percentuais, e o tempo máximo gasto para chegar nela
+TOLERANCIA_STATS = 2.5
+TEMPO_MAXIMO_STATS = 0.25
 
 class GameLogic:
-    def __init__(self):
+    def __init__(self, stats_em_segundo_plano=True, executor_stats=None, registro=None, rng=None,
+                 calcular_stats=True):
         self.fichas = 1000
         self.aposta_ante = 10
-        self.baralho = None
+        # Baralho reaproveitado entre as rodadas; rng injetável para distribuições reprodutíveis
+        self.baralho = Baralho(rng)
         self.mao_jogador = []
         self.mao_dealer = []
         self.cartas_comunitarias = []
+        # Equity da rodada atual, atualizada incrementalmente a cada street
+        self.rastreador = None
         self.fase = "INICIO"
         self.mensagem = "Bem-vindo ao Casino Hold'em!"
         
@@ -215,17 +758,37 @@ class GameLogic:
         self.total_jogos = 0
         self.total_vitorias = 0
         
+        # Histórico completo opcional (hand_log.RegistroMaos): uma linha por rodada
+        self.registro = registro
+        
         self.stats = None
+        
+        # Versão do estado: muda a cada alteração visível (ação do jogador ou stats
+        # publicadas pela thread), para a interface só redesenhar quando preciso
+        self._versoes = itertools.count(1)
+        self.versao = 0
+        
+        # Stats calculadas numa thread: a geração invalida resultados de fases anteriores.
+        # calcular_stats=False desliga as stats (replays e simulações sem painel).
+        self.calcular_stats = calcular_stats
+        self.stats_em_segundo_plano = stats_em_segundo_plano
+        self.stats_futuro = None
+        self._geracao_stats = 0
+        self._trava_stats = threading.Lock()
+        # Um executor compartilhado pode ser injetado (servidor com muitas mesas)
+        self._executor_stats = executor_stats
     
     def iniciar_rodada(self):
+        self._alterado()
         if self.fichas < self.aposta_ante * 2:
             self.mensagem = "Fichas insuficientes!"
             return False
         
-        self.baralho = Baralho()
-        self.mao_jogador = [self.baralho.dar_carta() for _ in range(2)]
-        self.mao_dealer = [self.baralho.dar_carta() for _ in range(2)]
+        self.baralho.embaralhar()
+        self.mao_jogador = self.baralho.dar_cartas(2)
+        self.mao_dealer = self.baralho.dar_cartas(2)
         self.cartas_comunitarias = []
+        self.rastreador = RastreadorEquity(self.mao_jogador) if self.calcular_stats else None
         self.fichas -= self.aposta_ante
         self.fase = "PRE_FLOP"
         self.mensagem = "Suas cartas foram distribuídas. CALL (2x ante) ou FOLD?"
@@ -233,6 +796,7 @@ class GameLogic:
         return True
     
     def call(self):
+        self._alterado()
         if self.fase == "PRE_FLOP":
             if self.fichas < self.aposta_ante * 2:
                 self.mensagem = "Fichas insuficientes para CALL!"
@@ -246,10 +810,10 @@ class GameLogic:
                 self.fase = "FIM"
                 return
             
-            self.cartas_comunitarias = [self.baralho.dar_carta() for _ in range(3)]
+            self.cartas_comunitarias = self.baralho.dar_cartas(3)
             self.mensagem = "FLOP revelado. Clique em CONTINUAR para o TURN."
             self.atualizar_stats()
-            
+        
         elif self.fase == "FLOP":
             if self.baralho.cartas_restantes() < 1:
                 self.mensagem = "Erro: cartas insuficientes no baralho!"
@@ -260,7 +824,7 @@ class GameLogic:
             self.cartas_comunitarias.append(self.baralho.dar_carta())
             self.mensagem = "TURN revelado. Clique em CONTINUAR para o RIVER."
             self.atualizar_stats()
-            
+        
         elif self.fase == "TURN":
             if self.baralho.cartas_restantes() < 1:
                 self.mensagem = "Erro: cartas insuficientes no baralho!"
@@ -271,47 +835,65 @@ class GameLogic:
             self.cartas_comunitarias.append(self.baralho.dar_carta())
             self.mensagem = "RIVER revelado. Clique em CONTINUAR para SHOWDOWN."
             self.atualizar_stats()
-            
+        
         elif self.fase == "RIVER":
             self.showdown()
     
     def fold(self):
         if self.fase == "PRE_FLOP":
+            self._alterado()
             self.mensagem = f"Você desistiu. Perdeu ${self.aposta_ante}."
             self.adicionar_historico("FOLD", -self.aposta_ante)
+            self._registrar_rodada("FOLD", -self.aposta_ante)
             self.fase = "FIM"
+            self.cancelar_stats()
     
     def showdown(self):
-        mao_jogador_completa = self.mao_jogador + self.cartas_comunitarias
-        mao_dealer_completa = self.mao_dealer + self.cartas_comunitarias
-        
-        tipo_jogador, valores_jogador = AvaliadorMao.avaliar_mao(mao_jogador_completa)
-        tipo_dealer, valores_dealer = AvaliadorMao.avaliar_mao(mao_dealer_completa)
+        forca_jogador = AvaliadorMao.forca(self.mao_jogador + self.cartas_comunitarias)
+        forca_dealer = AvaliadorMao.forca(self.mao_dealer + self.cartas_comunitarias)
+        tipo_jogador = AvaliadorMao.tipo(forca_jogador)
+        tipo_dealer = AvaliadorMao.tipo(forca_dealer)
         
         total_apostado = self.aposta_ante * 3
+        resultado, ganho = GameLogic.resolver_showdown(forca_jogador, forca_dealer, self.aposta_ante)
+        self.fichas += total_apostado + ganho
         
-        # Verificar se dealer qualifica (par de 4s ou melhor)
-        dealer_qualifica = tipo_dealer >= TipoMao.PAR and (tipo_dealer > TipoMao.PAR or valores_dealer[0] >= 4)
-        
-        if not dealer_qualifica:
-            ganho = self.aposta_ante * 2
-            self.fichas += total_apostado + ganho
+        if resultado == "NAO_QUALIFICOU":
             self.mensagem = f"Dealer não qualificou! Você ganhou ${ganho}. Sua mão: {tipo_jogador.value[1]}"
             self.adicionar_historico("VITÓRIA (Dealer não qualificou)", ganho)
-        elif tipo_jogador > tipo_dealer or (tipo_jogador == tipo_dealer and valores_jogador > valores_dealer):
-            ganho = self.aposta_ante * 2
-            self.fichas += total_apostado + ganho
+        elif resultado == "VITORIA":
             self.mensagem = f"Você venceu! Ganhou ${ganho}. {tipo_jogador.value[1]} vs {tipo_dealer.value[1]}"
             self.adicionar_historico("VITÓRIA", ganho)
-        elif tipo_jogador == tipo_dealer and valores_jogador == valores_dealer:
-            self.fichas += total_apostado
+        elif resultado == "EMPATE":
             self.mensagem = f"Empate! Apostas devolvidas. {tipo_jogador.value[1]}"
             self.adicionar_historico("EMPATE", 0)
         else:
             self.mensagem = f"Dealer venceu. Perdeu ${total_apostado}. {tipo_dealer.value[1]} vs {tipo_jogador.value[1]}"
-            self.adicionar_historico("DERROTA", -total_apostado)
+            self.adicionar_historico("DERROTA", ganho)
         
+        self._registrar_rodada(resultado, ganho, forca_jogador, forca_dealer)
         self.fase = "FIM"
+        self.cancelar_stats()
+    
+    def _registrar_rodada(self, resultado, ganho, forca_jogador=None, forca_dealer=None):
+        if self.registro is not None:
+            self.registro.registrar(self.mao_jogador, self.mao_dealer, self.cartas_comunitarias, resultado, ganho,
+                                    self.aposta_ante, forca_jogador, forca_dealer)
+    
+    def _alterado(self):
+        # next() no contador é atômico: seguro também a partir da thread de stats
+        self.versao = next(self._versoes)
+    
+    @staticmethod
+    def resolver_showdown(forca_jogador, forca_dealer, aposta_ante):
+        # Regras do showdown com ante + call (2x ante) na mesa: (resultado, ganho líquido)
+        if forca_dealer < FORCA_QUALIFICACAO_DEALER:
+            return "NAO_QUALIFICOU", aposta_ante * 2
+        if forca_jogador > forca_dealer:
+            return "VITORIA", aposta_ante * 2
+        if forca_jogador == forca_dealer:
+            return "EMPATE", 0
+        return "DERROTA", -aposta_ante * 3
     
     def adicionar_historico(self, resultado, ganho):
         self.historico.insert(0, {"resultado": resultado, "ganho": ganho})
@@ -323,13 +905,74 @@ class GameLogic:
             self.total_vitorias += 1
     
     def atualizar_stats(self):
+        self.cancelar_stats()
+        if not self.calcular_stats:
+            return
         if len(self.mao_jogador) > 0 and self.fase in ["PRE_FLOP", "FLOP", "TURN", "RIVER"]:
-            self.stats = CalculadorProbabilidades.calcular_equity(
-                self.mao_jogador, self.cartas_comunitarias, num_simulacoes=500
-            )
-            tipo_atual, _ = AvaliadorMao.avaliar_mao(self.mao_jogador + self.cartas_comunitarias)
-            self.stats['tipo_mao'] = tipo_atual.value[1]
-            self.stats['outs'] = CalculadorProbabilidades.calcular_outs(self.mao_jogador, self.cartas_comunitarias)
+            args = (self._geracao_stats, list(self.mao_jogador), list(self.cartas_comunitarias), self.rastreador)
+            if not self.stats_em_segundo_plano:
+                self._calcular_stats(*args)
+                return
+            if self._executor_stats is None:
+                self._executor_stats = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats")
+            self.stats_futuro = self._executor_stats.submit(self._calcular_stats, *args)
+    
+    def cancelar_stats(self):
+        with self._trava_stats:
+            self._geracao_stats += 1
+            self.stats = None
+            self._alterado()
+            if self.stats_futuro is not None:
+                self.stats_futuro.cancel()
+                self.stats_futuro = None
+    
+    def calculando_stats(self):
+        futuro = self.stats_futuro
+        return futuro is not None and not futuro.done()
+    
+    def _publicar_stats(self, geracao, stats):
+        with self._trava_stats:
+            if geracao != self._geracao_stats:
+                return False
+            self.stats = stats
+            self._alterado()
+            return True
+    
+    def _calcular_stats(self, geracao, mao_jogador, cartas_comunitarias, rastreador=None):
+        # Publica a equity assim que pronta (outs = None) e depois o resultado completo
+        # Do turn em diante a equity vem do rastreador; antes, da tabela ou do cálculo adaptativo
+        # Future.cancel() não para uma tarefa já em execução: o cálculo adaptativo
+        # consulta a geração entre os lotes e para assim que a street muda
+        def cancelado():
+            return geracao != self._geracao_stats
+        
+        stats = rastreador.equity(cartas_comunitarias) if rastreador is not None else None
+        if stats is None:
+            stats = CalculadorProbabilidades.calcular_equity(mao_jogador, cartas_comunitarias,
+                                                             tolerancia=TOLERANCIA_STATS,
+                                                             tempo_maximo=TEMPO_MAXIMO_STATS, cancelado=cancelado)
+        tipo_atual, _ = AvaliadorMao.avaliar_mao(mao_jogador + cartas_comunitarias)
+        stats['tipo_mao'] = tipo_atual.value[1]
+        stats['outs'] = None
+        stats['outs_por_tipo'] = None
+        if not cartas_comunitarias:
+            # Dica do pré-flop: EV exato do CALL pela tabela de optimal_strategy.py
+            from optimal_strategy import carregar_tabela_estrategia
+            tabela = carregar_tabela_estrategia()
+            if tabela is not None:
+                stats['ev_call'] = tabela.ev_call(mao_jogador)
+        if not self._publicar_stats(geracao, stats):
+            return
+        
+        outs_por_tipo = CalculadorProbabilidades.calcular_outs_por_tipo(mao_jogador, cartas_comunitarias)
+        stats = dict(stats, outs=sum(outs_por_tipo.values()), outs_por_tipo=outs_por_tipo)
+        if not self._publicar_stats(geracao, stats):
+            return
+        
+        # Com as stats do flop publicadas, a thread adianta a contagem do turn e do river.
+        # Nas stats síncronas isso atrasaria o clique: o turn enumera só os seus 46 rivers
+        if rastreador is not None and self.stats_em_segundo_plano:
+            rastreador.preparar(cartas_comunitarias, cancelado)
     
     def get_taxa_vitoria(self):
         return (self.total_vitorias / self.total_jogos * 100) if self.total_jogos > 0 else 0
\ No newline at end of file
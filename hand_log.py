@@ -0,0 +1,347 @@
+import mmap
+import os
+import struct
+import sys
+
+from game_logic import BARALHO_COMPLETO, Carta, _TIPOS
+from preflop_table import NUM_CLASSES, indice_classe
+from tables import caminho_dados
+
+# Histórico de rodadas em arquivo binário só de acréscimo, com registros de
+# tamanho fixo. Cabeçalho (magia, versão, tamanho do registro) seguido de um
+# registro por rodada:
+#   cartas   u64: 9 cartas de 6 bits (jogador 2, dealer 2, mesa 5; 63 = sem
+#                 carta) e o código do resultado nos bits 54-56
+#   ganho    i32: ganho líquido da rodada
+#   ante     u16
+#   tipos    u8:  tipo da mão do jogador + 1 nos 4 bits baixos e do dealer nos
+#                 altos (0 = sem showdown)
+ARQUIVO_HISTORICO = caminho_dados("historico_maos.bin")
+MAGIA = b"CHHL"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sII")
+REGISTRO = struct.Struct("<QiHBx")
+SEM_CARTA = 63
+RESULTADOS = ["FOLD", "NAO_QUALIFICOU", "VITORIA", "EMPATE", "DERROTA"]
+_CODIGO_RESULTADO = {resultado: i for i, resultado in enumerate(RESULTADOS)}
+_POSICOES = (2, 2, 5)
+REGISTROS_POR_BLOCO = 65536
+
+def codificar_cartas(indices_jogador, indices_dealer, indices_mesa, resultado):
+    codigo = 0
+    deslocamento = 0
+    for indices, tamanho in zip((indices_jogador, indices_dealer, indices_mesa), _POSICOES):
+        for i in range(tamanho):
+            codigo |= (indices[i] if i < len(indices) else SEM_CARTA) << deslocamento
+            deslocamento += 6
+    return codigo | _CODIGO_RESULTADO[resultado] << 54
+
+def decodificar_cartas(codigo):
+    cartas = [(codigo >> (6 * i)) & 63 for i in range(9)]
+    grupos = ([BARALHO_COMPLETO[i] for i in cartas[:2] if i != SEM_CARTA],
+              [BARALHO_COMPLETO[i] for i in cartas[2:4] if i != SEM_CARTA],
+              [BARALHO_COMPLETO[i] for i in cartas[4:] if i != SEM_CARTA])
+    return grupos + (RESULTADOS[(codigo >> 54) & 7],)
+
+def nome_classe(indice):
+    # Nome da mão inicial de uma célula da grade de preflop_table ("AKs", "T9o", "77")
+    linha, coluna = divmod(indice, 13)
+    alta, baixa = Carta.VALORES[max(linha, coluna)], Carta.VALORES[min(linha, coluna)]
+    alta, baixa = ("T" if alta == "10" else alta), ("T" if baixa == "10" else baixa)
+    if linha == coluna:
+        return alta + baixa
+    return alta + baixa + ("s" if linha > coluna else "o")
+
+class RegistroMaos:
+    # Escritor: acrescenta registros ao fim do arquivo, em lotes de
+    # registros_por_escrita (1 = cada rodada vai para o disco na hora)
+    def __init__(self, caminho=ARQUIVO_HISTORICO, registros_por_escrita=4096):
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        tamanho_arquivo = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+        # Cabeçalho incompleto (escrita interrompida na criação): recomeça o arquivo
+        novo = tamanho_arquivo < CABECALHO.size
+        if novo and tamanho_arquivo:
+            os.truncate(caminho, 0)
+        if not novo:
+            with open(caminho, "rb") as arquivo:
+                magia, versao, tamanho = CABECALHO.unpack(arquivo.read(CABECALHO.size))
+            if magia != MAGIA or versao != VERSAO or tamanho != REGISTRO.size:
+                raise ValueError(f"Histórico de mãos inválido: {caminho}")
+            # Registro final incompleto (escrita interrompida): descarta os bytes
+            # soltos, senão todos os registros acrescentados ficariam desalinhados
+            dados = tamanho_arquivo - CABECALHO.size
+            if dados % REGISTRO.size:
+                os.truncate(caminho, CABECALHO.size + dados // REGISTRO.size * REGISTRO.size)
+        self.caminho = caminho
+        self.registros_por_escrita = registros_por_escrita
+        self._arquivo = open(caminho, "ab")
+        if novo:
+            self._arquivo.write(CABECALHO.pack(MAGIA, VERSAO, REGISTRO.size))
+        self._buffer = bytearray()
+        self._pendentes = 0
+    
+    def registrar_indices(self, indices_jogador, indices_dealer, indices_mesa, resultado, ganho, ante,
+                          forca_jogador=None, forca_dealer=None):
+        tipos = 0
+        if forca_jogador is not None:
+            tipos = (forca_jogador >> 20) + 1 | ((forca_dealer >> 20) + 1) << 4
+        self._buffer += REGISTRO.pack(codificar_cartas(indices_jogador, indices_dealer, indices_mesa, resultado),
+                                      ganho, ante, tipos)
+        self._pendentes += 1
+        if self._pendentes >= self.registros_por_escrita:
+            self.descarregar()
+    
+    def registrar(self, mao_jogador, mao_dealer, cartas_comunitarias, resultado, ganho, ante,
+                  forca_jogador=None, forca_dealer=None):
+        self.registrar_indices([c.indice for c in mao_jogador], [c.indice for c in mao_dealer],
+                               [c.indice for c in cartas_comunitarias], resultado, ganho, ante,
+                               forca_jogador, forca_dealer)
+    
+    def descarregar(self):
+        if self._buffer:
+            self._arquivo.write(self._buffer)
+            self._arquivo.flush()
+            self._buffer.clear()
+            self._pendentes = 0
+    
+    def fechar(self):
+        if not self._arquivo.closed:
+            self.descarregar()
+            self._arquivo.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+class LeitorMaos:
+    # Leitor via mmap: nada é carregado além das páginas efetivamente lidas.
+    # Um registro final incompleto (escrita interrompida) é ignorado.
+    def __init__(self, caminho=ARQUIVO_HISTORICO):
+        with open(caminho, "rb") as arquivo:
+            self._mmap = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < CABECALHO.size:
+            self._mmap.close()
+            raise ValueError(f"Histórico de mãos inválido: {caminho}")
+        magia, versao, tamanho = CABECALHO.unpack_from(self._mmap, 0)
+        if magia != MAGIA or versao != VERSAO or tamanho != REGISTRO.size:
+            self._mmap.close()
+            raise ValueError(f"Histórico de mãos inválido: {caminho}")
+        self.num_registros = (len(self._mmap) - CABECALHO.size) // REGISTRO.size
+    
+    def __len__(self):
+        return self.num_registros
+    
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += self.num_registros
+        if not 0 <= indice < self.num_registros:
+            raise IndexError(indice)
+        codigo, ganho, ante, tipos = REGISTRO.unpack_from(self._mmap, CABECALHO.size + indice * REGISTRO.size)
+        mao_jogador, mao_dealer, cartas_comunitarias, resultado = decodificar_cartas(codigo)
+        return {
+            'mao_jogador': mao_jogador,
+            'mao_dealer': mao_dealer,
+            'cartas_comunitarias': cartas_comunitarias,
+            'resultado': resultado,
+            'ganho': ganho,
+            'ante': ante,
+            'tipo_jogador': _TIPOS[(tipos & 0xF) - 1] if tipos else None,
+            'tipo_dealer': _TIPOS[(tipos >> 4) - 1] if tipos else None,
+        }
+    
+    def blocos(self, registros_por_bloco=REGISTROS_POR_BLOCO):
+        # Fatias do mmap com um número inteiro de registros, sem cópia
+        visao = memoryview(self._mmap)
+        for inicio in range(0, self.num_registros, registros_por_bloco):
+            fim = min(inicio + registros_por_bloco, self.num_registros)
+            yield visao[CABECALHO.size + inicio * REGISTRO.size:CABECALHO.size + fim * REGISTRO.size]
+    
+    def fechar(self):
+        self._mmap.close()
+
+def _novo_acumulador():
+    return {
+        'rodadas_classe': [0] * NUM_CLASSES,
+        'vitorias_classe': [0] * NUM_CLASSES,
+        'ganho_classe': [0] * NUM_CLASSES,
+        'rodadas_acao': [0, 0],
+        'ganho_acao': [0, 0],
+        'ante_acao': [0, 0],
+        'nao_qualificou': 0,
+    }
+
+def _acumular_bloco(acumulador, bloco):
+    rodadas_classe = acumulador['rodadas_classe']
+    vitorias_classe = acumulador['vitorias_classe']
+    ganho_classe = acumulador['ganho_classe']
+    rodadas_acao = acumulador['rodadas_acao']
+    ganho_acao = acumulador['ganho_acao']
+    ante_acao = acumulador['ante_acao']
+    for codigo, ganho, ante, _ in REGISTRO.iter_unpack(bloco):
+        classe = indice_classe(codigo & 63, (codigo >> 6) & 63)
+        resultado = (codigo >> 54) & 7
+        rodadas_classe[classe] += 1
+        ganho_classe[classe] += ganho
+        if ganho > 0:
+            vitorias_classe[classe] += 1
+        acao = resultado != 0
+        rodadas_acao[acao] += 1
+        ganho_acao[acao] += ganho
+        ante_acao[acao] += ante
+        if resultado == 1:
+            acumulador['nao_qualificou'] += 1
+
+def _registros_numpy(bloco):
+    import numpy as np
+    
+    return np.frombuffer(bloco, dtype=np.dtype([('codigo', '<u8'), ('ganho', '<i4'), ('ante', '<u2'),
+                                                ('tipos', 'u1'), ('_', 'u1')]))
+
+def _acumular_bloco_numpy(acumulador, bloco):
+    import numpy as np
+    
+    registros = _registros_numpy(bloco)
+    codigo = registros['codigo']
+    ganho = registros['ganho'].astype(np.int64)
+    a = (codigo & 63).astype(np.int64)
+    b = ((codigo >> 6) & 63).astype(np.int64)
+    valor_a, valor_b = a % 13, b % 13
+    alta, baixa = np.maximum(valor_a, valor_b), np.minimum(valor_a, valor_b)
+    classe = np.where(a // 13 == b // 13, alta * 13 + baixa, baixa * 13 + alta)
+    resultado = ((codigo >> 54) & 7).astype(np.int64)
+    acao = (resultado != 0).astype(np.int64)
+    
+    for chave, valores in (('rodadas_classe', np.bincount(classe, minlength=NUM_CLASSES)),
+                           ('vitorias_classe', np.bincount(classe, ganho > 0, minlength=NUM_CLASSES)),
+                           ('ganho_classe', np.bincount(classe, ganho, minlength=NUM_CLASSES)),
+                           ('rodadas_acao', np.bincount(acao, minlength=2)),
+                           ('ganho_acao', np.bincount(acao, ganho, minlength=2)),
+                           ('ante_acao', np.bincount(acao, registros['ante'], minlength=2))):
+        destino = acumulador[chave]
+        for i, valor in enumerate(valores.tolist()):
+            destino[i] += int(valor)
+    acumulador['nao_qualificou'] += int(np.count_nonzero(resultado == 1))
+
+def agregar(caminho=ARQUIVO_HISTORICO, vetorizado=False, registros_por_bloco=REGISTROS_POR_BLOCO):
+    # Uma única passada em blocos sobre o mmap: memória constante qualquer que
+    # seja o tamanho do histórico
+    leitor = LeitorMaos(caminho)
+    acumulador = _novo_acumulador()
+    acumular = _acumular_bloco_numpy if vetorizado else _acumular_bloco
+    try:
+        for bloco in leitor.blocos(registros_por_bloco):
+            acumular(acumulador, bloco)
+            bloco.release()
+    finally:
+        leitor.fechar()
+    
+    por_mao_inicial = {}
+    for classe in range(NUM_CLASSES):
+        rodadas = acumulador['rodadas_classe'][classe]
+        if rodadas:
+            por_mao_inicial[nome_classe(classe)] = {
+                'rodadas': rodadas,
+                'vitorias': acumulador['vitorias_classe'][classe],
+                'taxa_vitoria': acumulador['vitorias_classe'][classe] / rodadas * 100,
+                'ev': acumulador['ganho_classe'][classe] / rodadas,
+            }
+    
+    por_acao = {}
+    for acao, nome in enumerate(("FOLD", "CALL")):
+        rodadas = acumulador['rodadas_acao'][acao]
+        por_acao[nome] = {
+            'rodadas': rodadas,
+            'ev': acumulador['ganho_acao'][acao] / rodadas if rodadas else 0.0,
+            'ev_por_ante': acumulador['ganho_acao'][acao] / acumulador['ante_acao'][acao] if rodadas else 0.0,
+        }
+    
+    rodadas_call = acumulador['rodadas_acao'][1]
+    return {
+        'rodadas': sum(acumulador['rodadas_acao']),
+        'por_mao_inicial': por_mao_inicial,
+        'por_acao': por_acao,
+        'nao_qualificacao': {
+            'rodadas_call': rodadas_call,
+            'nao_qualificou': acumulador['nao_qualificou'],
+            'taxa': acumulador['nao_qualificou'] / rodadas_call * 100 if rodadas_call else 0.0,
+        },
+    }
+
+def _auditar_bloco(bloco):
+    # Refaz o showdown das rodadas do bloco em lote e devolve as posições cujo
+    # resultado, ganho ou tipos gravados divergem das regras
+    import numpy as np
+    from batch_eval import FOLD, resolver_showdown_lote
+    
+    registros = _registros_numpy(bloco)
+    codigo = registros['codigo']
+    cartas = ((codigo[:, None] >> (np.arange(9, dtype=np.uint64) * np.uint64(6))) & np.uint64(63)).astype(np.intp)
+    resultado = ((codigo >> np.uint64(54)) & np.uint64(7)).astype(np.int8)
+    ganho = registros['ganho'].astype(np.int64)
+    ante = registros['ante'].astype(np.int64)
+    tipos = registros['tipos'].astype(np.int64)
+    
+    # FOLD: só o ante perdido e sem tipos; as demais rodadas passam pelo showdown
+    divergente = (resultado == FOLD) & ((ganho != -ante) | (tipos != 0))
+    showdown = np.nonzero(resultado != FOLD)[0]
+    if len(showdown):
+        lote = resolver_showdown_lote(cartas[showdown, :2], cartas[showdown, 2:4], cartas[showdown, 4:],
+                                      ante[showdown])
+        tipos_esperados = (lote['forca_jogador'] >> 20) + 1 | ((lote['forca_dealer'] >> 20) + 1) << 4
+        divergente[showdown] = ((lote['resultado'] != resultado[showdown]) | (lote['ganho'] != ganho[showdown])
+                                | (tipos_esperados != tipos[showdown]))
+    return len(showdown), int(ganho.sum()), np.nonzero(divergente)[0]
+
+def auditar(caminho=ARQUIVO_HISTORICO, registros_por_bloco=REGISTROS_POR_BLOCO, max_divergencias=10):
+    # Confere cada rodada do histórico contra GameLogic.resolver_showdown (requer NumPy)
+    leitor = LeitorMaos(caminho)
+    showdowns = ganho_total = divergencias = 0
+    primeiras = []
+    try:
+        for numero, bloco in enumerate(leitor.blocos(registros_por_bloco)):
+            showdowns_bloco, ganho_bloco, posicoes = _auditar_bloco(bloco)
+            bloco.release()
+            showdowns += showdowns_bloco
+            ganho_total += ganho_bloco
+            divergencias += len(posicoes)
+            inicio = numero * registros_por_bloco
+            primeiras.extend(inicio + int(p) for p in posicoes[:max_divergencias - len(primeiras)])
+    finally:
+        leitor.fechar()
+    return {
+        'rodadas': len(leitor),
+        'showdowns': showdowns,
+        'ganho_total': ganho_total,
+        'divergencias': divergencias,
+        'primeiras_divergencias': primeiras,
+    }
+
+def imprimir_relatorio(relatorio, num_maos=10):
+    print(f"Rodadas: {relatorio['rodadas']}")
+    for nome, dados in relatorio['por_acao'].items():
+        print(f"  {nome}: {dados['rodadas']} rodadas, EV {dados['ev']:+.3f} fichas "
+              f"({dados['ev_por_ante'] * 100:+.2f}% do ante)")
+    nao_qualificacao = relatorio['nao_qualificacao']
+    print(f"Dealer não qualificou em {nao_qualificacao['taxa']:.2f}% dos CALLs")
+    maos = sorted(relatorio['por_mao_inicial'].items(), key=lambda item: item[1]['ev'], reverse=True)
+    print("Melhores mãos iniciais por EV:")
+    for nome, dados in maos[:num_maos]:
+        print(f"  {nome:4s} {dados['rodadas']:10d} rodadas, vitória {dados['taxa_vitoria']:5.1f}%, "
+              f"EV {dados['ev']:+.2f}")
+
+if __name__ == "__main__":
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+    caminho = argumentos[0] if argumentos else ARQUIVO_HISTORICO
+    if "--auditar" in sys.argv:
+        auditoria = auditar(caminho)
+        print(f"Auditoria: {auditoria['rodadas']} rodadas, {auditoria['showdowns']} showdowns, "
+              f"ganho total {auditoria['ganho_total']:+d}, {auditoria['divergencias']} divergências")
+        leitor = LeitorMaos(caminho)
+        for indice in auditoria['primeiras_divergencias']:
+            print(f"  rodada {indice}: {leitor[indice]}")
+        leitor.fechar()
+    else:
+        imprimir_relatorio(agregar(caminho, vetorizado="--numpy" in sys.argv))
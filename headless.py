@@ -0,0 +1,111 @@
+import argparse
+import sys
+import time
+
+# Ponto de entrada sem interface gráfica: python -m headless simular|equity|tabelas.
+# Cada comando importa só o que usa e nenhum deles importa o pygame; as tabelas
+# são lidas do disco (ou construídas e gravadas) na primeira vez que são usadas.
+
+def comando_simular(argumentos):
+    from simulator import SimuladorRodadas, imprimir_relatorio, sempre_call
+    
+    if argumentos.otima:
+        from optimal_strategy import estrategia_otima as estrategia
+    else:
+        estrategia = sempre_call
+    if argumentos.registro:
+        from hand_log import RegistroMaos
+        with RegistroMaos(argumentos.registro) as registro:
+            simulador = SimuladorRodadas(estrategia, argumentos.ante, argumentos.semente, registro)
+            imprimir_relatorio(simulador.simular(argumentos.rodadas))
+    else:
+        imprimir_relatorio(SimuladorRodadas(estrategia, argumentos.ante, argumentos.semente).simular(argumentos.rodadas))
+
+def comando_equity(argumentos):
+    from game_logic import BARALHO_COMPLETO, CalculadorProbabilidades
+    from ranges import interpretar_cartas
+    
+    mao = [BARALHO_COMPLETO[i] for i in interpretar_cartas(argumentos.mao)]
+    mesa = [BARALHO_COMPLETO[i] for i in interpretar_cartas(argumentos.mesa)] if argumentos.mesa else []
+    if argumentos.oponentes == 1 and argumentos.range is None:
+        # Um oponente aleatório: o caminho do jogo, sem NumPy
+        resultado = CalculadorProbabilidades.calcular_equity(mao, mesa, argumentos.simulacoes,
+                                                             exato=True if argumentos.exato else None,
+                                                             semente=argumentos.semente)
+    else:
+        resultado = CalculadorProbabilidades.calcular_equity_oponentes(mao, mesa, argumentos.oponentes,
+                                                                       argumentos.range or "aleatoria",
+                                                                       semente=argumentos.semente)
+    linha = f"Vitória {resultado['vitoria']}% | Empate {resultado['empate']}% | Derrota {resultado['derrota']}%"
+    if 'equity' in resultado:
+        linha += f" | Equity {resultado['equity']}%"
+    print(linha)
+
+def comando_banca(argumentos):
+    from bankroll import imprimir_relatorio, simular_bancas
+    
+    imprimir_relatorio(simular_bancas(argumentos.fichas, argumentos.antes, argumentos.sessoes, argumentos.rodadas,
+                                      "sempre_call" if argumentos.sempre_call else "otima", argumentos.semente,
+                                      argumentos.workers))
+
+def comando_tabelas(argumentos):
+    # Carrega (ou constrói) cada tabela e mostra o tempo; --gerar refaz as tabelas exatas
+    import game_logic
+    from tables import caminho_tabela
+    inicio = time.perf_counter()
+    game_logic.tabelas_avaliador()
+    print(f"avaliador: {(time.perf_counter() - inicio) * 1000:.1f} ms "
+          f"({caminho_tabela('avaliador', game_logic.VERSAO_TABELAS_AVALIADOR)})")
+    
+    from optimal_strategy import ARQUIVO_ESTRATEGIA, TabelaEstrategia, gerar_tabela_estrategia
+    from preflop_table import ARQUIVO_PREFLOP, TabelaPreflop, gerar_tabela_preflop
+    for nome, classe, caminho, gerar in (("pré-flop", TabelaPreflop, ARQUIVO_PREFLOP, gerar_tabela_preflop),
+                                          ("estratégia", TabelaEstrategia, ARQUIVO_ESTRATEGIA, gerar_tabela_estrategia)):
+        if argumentos.gerar:
+            gerar(caminho)
+        inicio = time.perf_counter()
+        try:
+            classe(caminho).fechar()
+        except (OSError, ValueError) as erro:
+            print(f"{nome}: indisponível ({erro}); gere com --gerar")
+            continue
+        print(f"{nome}: {(time.perf_counter() - inicio) * 1000:.1f} ms ({caminho})")
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="python -m headless", description="Casino Hold'em sem interface gráfica")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    
+    simular = comandos.add_parser("simular", aliases=["simulate"], help="Simula rodadas (EV e variância)")
+    simular.add_argument("rodadas", type=int, nargs="?", default=1000000)
+    simular.add_argument("--semente", type=int)
+    simular.add_argument("--ante", type=int, default=10)
+    simular.add_argument("--otima", action="store_true", help="Estratégia ótima em vez de pagar sempre")
+    simular.add_argument("--registro", help="Grava as rodadas num histórico (hand_log.py)")
+    simular.set_defaults(funcao=comando_simular)
+    
+    equity = comandos.add_parser("equity", help="Equity de uma mão (ex.: AsKh --mesa Qh7c2d)")
+    equity.add_argument("mao")
+    equity.add_argument("--mesa")
+    equity.add_argument("--oponentes", type=int, default=1)
+    equity.add_argument("--range", help="Range dos oponentes (ranges.py); requer NumPy")
+    equity.add_argument("--simulacoes", type=int, default=10000)
+    equity.add_argument("--exato", action="store_true")
+    equity.add_argument("--semente", type=int)
+    equity.set_defaults(funcao=comando_equity)
+    
+    from bankroll import criar_parser as parser_banca
+    comandos.add_parser("banca", aliases=["bankroll"], parents=[parser_banca(add_help=False)],
+                        help="Risco de ruína por banca e ante").set_defaults(funcao=comando_banca)
+    
+    tabelas = comandos.add_parser("tabelas", help="Carrega as tabelas em disco e mostra os tempos")
+    tabelas.add_argument("--gerar", action="store_true", help="Regenera as tabelas exatas (requer NumPy)")
+    tabelas.set_defaults(funcao=comando_tabelas)
+    return parser
+
+def main(argv=None):
+    argumentos = criar_parser().parse_args(argv)
+    argumentos.funcao(argumentos)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+# Instrumentação dos caminhos quentes. Desligada, não custa nada: os
+# cronômetros são instalados envolvendo os métodos registrados só em ativar()
+# e removidos em desativar(). Os contadores explícitos (contar) custam uma
+# chamada e um teste de flag por chamada instrumentada.
+ativo = False
+
+AMOSTRAS_RECENTES = 512
+
+_tempos = {}
+_contadores = defaultdict(int)
+_pilhas = defaultdict(float)
+_local = threading.local()
+_trava = threading.Lock()
+_originais = {}
+
+# (módulo, classe, atributo, nome da métrica)
+PONTOS_QUENTES = [
+    ("game_logic", "AvaliadorMao", "avaliar_mao", "avaliador.avaliar_mao"),
+    ("game_logic", "AvaliadorMao", "forca", "avaliador.forca"),
+    ("game_logic", "AvaliadorMao", "forca_indices", "avaliador.forca_indices"),
+    ("game_logic", "CalculadorProbabilidades", "calcular_equity", "equity.calcular_equity"),
+    ("game_logic", "CalculadorProbabilidades", "calcular_outs_por_tipo", "outs.calcular_outs_por_tipo"),
+    ("game_logic", "GameLogic", "_calcular_stats", "stats.calcular"),
+    ("game_interface", "GameInterface", "desenhar_tela", "interface.desenhar_tela"),
+    ("game_interface", "GameInterface", "atualizar_tela", "interface.atualizar_tela"),
+]
+
+class _Tempo:
+    def __init__(self):
+        self.chamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.ultimo = 0.0
+        self.recentes = deque(maxlen=AMOSTRAS_RECENTES)
+
+def contar(nome, n=1):
+    if ativo:
+        _contadores[nome] += n
+
+def registrar_tempo(nome, segundos):
+    with _trava:
+        tempo = _tempos.get(nome)
+        if tempo is None:
+            tempo = _tempos[nome] = _Tempo()
+        tempo.chamadas += 1
+        tempo.total += segundos
+        tempo.maximo = max(tempo.maximo, segundos)
+        tempo.ultimo = segundos
+        tempo.recentes.append(segundos)
+
+class cronometro:
+    # Bloco cronometrado: with cronometro("nome"): ...
+    def __init__(self, nome):
+        self.nome = nome
+        self.medindo = False
+    
+    def __enter__(self):
+        self.medindo = ativo
+        if self.medindo:
+            _entrar(self.nome)
+        return self
+    
+    def __exit__(self, *exc):
+        if self.medindo:
+            _sair(self.nome)
+        return False
+
+def _entrar(nome):
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    pilha.append([nome, time.perf_counter(), 0.0])
+
+def _sair(nome):
+    pilha = getattr(_local, "pilha", None)
+    if not pilha:
+        return
+    nome, inicio, filhos = pilha[-1]
+    duracao = time.perf_counter() - inicio
+    caminho = ";".join(quadro[0] for quadro in pilha)
+    pilha.pop()
+    if pilha:
+        pilha[-1][2] += duracao
+    registrar_tempo(nome, duracao)
+    with _trava:
+        _pilhas[caminho] += duracao - filhos
+
+def _envolver(funcao, nome):
+    @functools.wraps(funcao)
+    def instrumentada(*args, **kwargs):
+        _entrar(nome)
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            _sair(nome)
+    return instrumentada
+
+def ativar():
+    global ativo
+    if ativo:
+        return
+    for modulo, classe, atributo, nome in PONTOS_QUENTES:
+        # Só instrumenta módulos já importados (não puxa o pygame num processo headless)
+        if modulo not in sys.modules:
+            continue
+        alvo = getattr(sys.modules[modulo], classe)
+        original = vars(alvo)[atributo]
+        _originais[(alvo, atributo)] = original
+        if isinstance(original, staticmethod):
+            setattr(alvo, atributo, staticmethod(_envolver(original.__func__, nome)))
+        else:
+            setattr(alvo, atributo, _envolver(original, nome))
+    ativo = True
+
+def desativar():
+    global ativo
+    for (alvo, atributo), original in _originais.items():
+        setattr(alvo, atributo, original)
+    _originais.clear()
+    ativo = False
+
+def alternar():
+    if ativo:
+        desativar()
+    else:
+        ativar()
+    return ativo
+
+def limpar():
+    with _trava:
+        _tempos.clear()
+        _contadores.clear()
+        _pilhas.clear()
+
+def percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+def _resumir(tempo):
+    recentes = sorted(tempo.recentes)
+    return {
+        'chamadas': tempo.chamadas,
+        'total_ms': tempo.total * 1000,
+        'media_ms': tempo.total / tempo.chamadas * 1000,
+        'maximo_ms': tempo.maximo * 1000,
+        'ultimo_ms': tempo.ultimo * 1000,
+        'p50_ms': percentil(recentes, 0.50) * 1000,
+        'p95_ms': percentil(recentes, 0.95) * 1000,
+        'p99_ms': percentil(recentes, 0.99) * 1000,
+    }
+
+def resumo_tempo(nome):
+    with _trava:
+        tempo = _tempos.get(nome)
+        return _resumir(tempo) if tempo else None
+
+def resumo():
+    with _trava:
+        tempos = {nome: _resumir(tempo) for nome, tempo in _tempos.items()}
+        return {'tempos': tempos, 'contadores': dict(_contadores)}
+
+def _preparar_diretorio(caminho):
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+
+def exportar_json(caminho):
+    _preparar_diretorio(caminho)
+    with open(caminho, "w") as arquivo:
+        json.dump(resumo(), arquivo, indent=2)
+
+def exportar_pilhas(caminho):
+    # Formato "folded" (pilha;separada;por;ponto-e-vírgula peso) aceito pelo
+    # flamegraph.pl e pelo speedscope; o peso é o tempo próprio em microssegundos.
+    with _trava:
+        linhas = [f"{caminho} {int(segundos * 1e6)}" for caminho, segundos in sorted(_pilhas.items())]
+    _preparar_diretorio(caminho)
+    with open(caminho, "w") as arquivo:
+        arquivo.write("\n".join(linhas) + "\n")
@@ -1,26 +1,64 @@
+import argparse
 import pygame
 import sys
+import instrumentation
+import equity_cache
+from hand_log import ARQUIVO_HISTORICO, RegistroMaos
 from game_logic import GameLogic
 from game_interface import GameInterface
+from random_streams import FluxoAleatorio
+from session import GravadorSessao
+from tables import caminho_dados
 
-def main():
-    # Inicializar a lógica do jogo
-    game_logic = GameLogic()
+# Espera máxima por eventos (ms) com e sem cálculo de stats em andamento
+TIMEOUT_CALCULANDO = 30
+TIMEOUT_OCIOSO = 500
+
+def main(gravar=None, semente=None):
+    # Equity de situações já vistas (a menos de troca de naipes) vem do cache salvo
+    equity_cache.ativar_cache(caminho=equity_cache.ARQUIVO_CACHE)
+    
+    # Inicializar a lógica do jogo, gravando cada rodada no histórico em disco.
+    # Com semente (ou gravando a sessão) o baralho sai de um fluxo reprodutível.
+    registro = RegistroMaos(ARQUIVO_HISTORICO, registros_por_escrita=1)
+    rng = FluxoAleatorio(semente) if gravar or semente is not None else None
+    game_logic = GameLogic(registro=registro, rng=rng)
+    gravador = GravadorSessao(gravar, rng.semente) if gravar else None
     
     # Inicializar a interface
-    game_interface = GameInterface(game_logic)
+    game_interface = GameInterface(game_logic, gravador)
+    
+    # Movimento do mouse não muda nada na tela: não acorda o loop
+    pygame.event.set_blocked(pygame.MOUSEMOTION)
     
     running = True
     
     try:
         while running:
-            for event in pygame.event.get():
+            # Bloqueia até chegar um evento; o timeout só serve para pegar as stats
+            # publicadas pela thread de cálculo e atualizar o overlay
+            if game_logic.calculando_stats() or game_interface.desatualizada():
+                timeout = TIMEOUT_CALCULANDO
+            else:
+                timeout = TIMEOUT_OCIOSO
+            eventos = [pygame.event.wait(timeout)] + pygame.event.get()
+            
+            for event in eventos:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     game_interface.processar_click(event.pos)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        game_interface.alternar_overlay()
+                    elif event.key == pygame.K_F4:
+                        # Exporta o perfil coletado desde que o overlay foi ligado
+                        instrumentation.exportar_json(caminho_dados("perfil.json"))
+                        instrumentation.exportar_pilhas(caminho_dados("perfil.folded"))
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                    game_interface.invalidar()
             
-            game_interface.desenhar_tela()
+            game_interface.atualizar_tela()
             game_interface.get_clock().tick(game_interface.get_fps())
     
     except Exception as e:
@@ -30,7 +68,15 @@ def main():
     
     finally:
         pygame.quit()
+        registro.fechar()
+        if gravador is not None:
+            gravador.fechar()
+        equity_cache.desativar_cache(caminho=equity_cache.ARQUIVO_CACHE)
         sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Casino Hold'em")
+    parser.add_argument("--gravar", metavar="ARQUIVO", help="Grava a sessão para reproduzir com session.py")
+    parser.add_argument("--semente", type=int, help="Semente do baralho (aleatória se omitida)")
+    argumentos = parser.parse_args()
+    main(argumentos.gravar, argumentos.semente)
\ No newline at end of file
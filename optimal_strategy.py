@@ -0,0 +1,179 @@
+import mmap
+import os
+import struct
+import sys
+
+from game_logic import FORCA_QUALIFICACAO_DEALER
+from preflop_table import NUM_CLASSES, indice_classe
+
+# Estratégia ótima de CALL/FOLD: para cada uma das 169 mãos iniciais, conta
+# exatamente, sobre todos os boards e todas as mãos do dealer, quantos casos
+# pagam (dealer não qualifica ou perde), empatam ou perdem o CALL. Com ante a,
+# EV(CALL) = a * (2 * pagos - 3 * perdidos) / total e EV(FOLD) = -a, então a
+# tabela não depende do valor do ante. Mesmo formato de preflop_table.py:
+# cabeçalho (magia, versão, registros) e um registro por célula da grade 13x13.
+ARQUIVO_ESTRATEGIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "optimal_strategy.bin")
+MAGIA = b"CHOS"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sII")
+REGISTRO = struct.Struct("<QQQQ")
+BOARDS_POR_TAREFA = 1024
+
+def _peso_classe(indice):
+    # Combinações de 2 cartas por célula: par 6, suited 4, offsuit 12
+    linha, coluna = divmod(indice, 13)
+    if linha == coluna:
+        return 6
+    return 4 if linha > coluna else 12
+
+class TabelaEstrategia:
+    def __init__(self, caminho=ARQUIVO_ESTRATEGIA):
+        with open(caminho, "rb") as arquivo:
+            self._mmap = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, versao, num_registros = CABECALHO.unpack_from(self._mmap, 0)
+        if magia != MAGIA or versao != VERSAO or num_registros != NUM_CLASSES:
+            self._mmap.close()
+            raise ValueError(f"Tabela de estratégia inválida: {caminho}")
+        # 169 registros: cabem em memória e evitam o unpack a cada consulta
+        self._contagens = [REGISTRO.unpack_from(self._mmap, CABECALHO.size + REGISTRO.size * i)
+                           for i in range(NUM_CLASSES)]
+        self._ev_call = [(2 * pagos - 3 * perdidos) / total for pagos, _, perdidos, total in self._contagens]
+    
+    def contagens(self, indice_a, indice_b):
+        # (pagos, empates, perdidos, total)
+        return self._contagens[indice_classe(indice_a, indice_b)]
+    
+    def ev_call(self, mao_jogador):
+        # EV do CALL em antes (o FOLD vale sempre -1)
+        return self._ev_call[indice_classe(mao_jogador[0].indice, mao_jogador[1].indice)]
+    
+    def deve_pagar(self, mao_jogador):
+        return self.ev_call(mao_jogador) > -1
+    
+    def vantagem_casa(self):
+        # EV da estratégia ótima por rodada, em antes, ponderado pelas 1326 mãos
+        ev = sum(_peso_classe(i) * max(self._ev_call[i], -1.0) for i in range(NUM_CLASSES)) / 1326
+        return {
+            'ev_por_ante': ev,
+            'vantagem_casa': -ev * 100,
+            'maos_call': sum(_peso_classe(i) for i in range(NUM_CLASSES) if self._ev_call[i] > -1) / 1326 * 100,
+        }
+    
+    def fechar(self):
+        self._mmap.close()
+
+_tabela = None
+_tabela_carregada = False
+
+def carregar_tabela_estrategia():
+    # Carregada uma única vez; sem o arquivo, quem chama segue sem a dica
+    global _tabela, _tabela_carregada
+    if not _tabela_carregada:
+        _tabela_carregada = True
+        try:
+            _tabela = TabelaEstrategia()
+        except (OSError, ValueError):
+            _tabela = None
+    return _tabela
+
+def estrategia_otima(mao_jogador):
+    # Estratégia para o SimuladorRodadas; sem a tabela, paga sempre
+    tabela = carregar_tabela_estrategia()
+    return tabela.deve_pagar(mao_jogador) if tabela else True
+
+def _contar_bloco(tarefa):
+    # Para cada board do bloco, avalia as 1326 mãos de 2 cartas e conta, para cada
+    # mão do jogador, as mãos do dealer disjuntas com força < max(força, qualificação)
+    # e iguais a ela (inclusão-exclusão sobre as mãos que compartilham a carta a ou b)
+    import itertools
+    import numpy as np
+    from batch_eval import CHAVES, forcas_lote
+    from preflop_table import _contar_por_linha
+    
+    boards, mascaras_boards, pesos = tarefa
+    maos = np.array(list(itertools.combinations(range(52), 2)), dtype=np.int64)
+    chaves_maos = CHAVES[maos].sum(axis=1)
+    bits_maos = (np.int64(1) << maos[:, 0]) | (np.int64(1) << maos[:, 1])
+    contem = np.array([np.nonzero((maos == c).any(axis=1))[0] for c in range(52)])
+    invalido = np.int64(1) << 30
+    qualificacao = np.int64(FORCA_QUALIFICACAO_DEALER)
+    
+    pagos = np.zeros(len(maos), dtype=np.int64)
+    empates = np.zeros(len(maos), dtype=np.int64)
+    perdidos = np.zeros(len(maos), dtype=np.int64)
+    
+    k = len(boards)
+    peso = pesos.astype(np.int64)[:, None]
+    validas = (mascaras_boards[:, None] & bits_maos[None, :]) == 0
+    forcas = np.full((k, len(maos)), invalido, dtype=np.int64)
+    chaves = CHAVES[boards].sum(axis=1)[:, None] + chaves_maos[None, :]
+    forcas[validas] = forcas_lote(chaves[validas], (mascaras_boards[:, None] | bits_maos[None, :])[validas])
+    
+    consultas = np.maximum(forcas, qualificacao).ravel()
+    linhas = np.repeat(np.arange(k, dtype=np.int64), len(maos))
+    menores, iguais = _contar_por_linha(forcas, consultas, linhas)
+    por_carta = forcas[:, contem]
+    menores_a, iguais_a = _contar_por_linha(por_carta, consultas, linhas * 52 + np.tile(maos[:, 0], k))
+    menores_b, iguais_b = _contar_por_linha(por_carta, consultas, linhas * 52 + np.tile(maos[:, 1], k))
+    
+    # A própria mão do jogador foi descontada duas vezes (pelas cartas a e b)
+    qualificada = forcas.ravel() >= qualificacao
+    abaixo = (menores - menores_a - menores_b + ~qualificada).reshape(k, -1)
+    iguais = (iguais - iguais_a - iguais_b + qualificada).reshape(k, -1)
+    # Pagam: dealer abaixo de max(jogador, qualificação). Empatam: dealer qualificado
+    # igual ao jogador. Perdem: o resto das 990 mãos do dealer.
+    empate = np.where(qualificada.reshape(k, -1), iguais, 0)
+    pagos += np.where(validas, abaixo * peso, 0).sum(axis=0)
+    empates += np.where(validas, empate * peso, 0).sum(axis=0)
+    perdidos += np.where(validas, (990 - abaixo - empate) * peso, 0).sum(axis=0)
+    return pagos, empates, perdidos
+
+def gerar_tabela_estrategia(caminho=ARQUIVO_ESTRATEGIA, workers=None, boards_por_tarefa=BOARDS_POR_TAREFA):
+    import itertools
+    import numpy as np
+    from preflop_table import _boards_canonicos
+    
+    boards, mascaras_boards, pesos = _boards_canonicos()
+    tarefas = [(boards[i:i + boards_por_tarefa], mascaras_boards[i:i + boards_por_tarefa],
+                pesos[i:i + boards_por_tarefa]) for i in range(0, len(boards), boards_por_tarefa)]
+    if workers and workers > 1:
+        from parallel import mapear
+        resultados = mapear(_contar_bloco, tarefas, workers)
+    else:
+        resultados = [_contar_bloco(tarefa) for tarefa in tarefas]
+    pagos, empates, perdidos = (sum(parcial) for parcial in zip(*resultados))
+    
+    maos = list(itertools.combinations(range(52), 2))
+    classes = np.array([indice_classe(a, b) for a, b in maos])
+    totais = np.zeros((NUM_CLASSES, 4), dtype=np.int64)
+    np.add.at(totais, classes, np.stack([pagos, empates, perdidos, pagos + empates + perdidos], axis=1))
+    
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGIA, VERSAO, NUM_CLASSES))
+        for registro in totais.tolist():
+            arquivo.write(REGISTRO.pack(*registro))
+    return caminho
+
+def imprimir_tabela(tabela):
+    from hand_log import nome_classe
+    
+    # Grade 13x13 como nas tabelas de estratégia: suited à direita da diagonal
+    print("EV do CALL em antes (FOLD = -1); * = FOLD")
+    for linha in range(12, -1, -1):
+        celulas = []
+        for coluna in range(12, -1, -1):
+            ev = tabela._ev_call[linha * 13 + coluna]
+            celulas.append(f"{nome_classe(linha * 13 + coluna):>3s}{ev:+5.2f}{'*' if ev <= -1 else ' '}")
+        print(" ".join(celulas))
+    resumo = tabela.vantagem_casa()
+    print(f"EV da estratégia ótima: {resumo['ev_por_ante']:+.5f} ante por rodada "
+          f"(vantagem da casa {resumo['vantagem_casa']:.3f}% do ante); CALL em {resumo['maos_call']:.1f}% das mãos")
+
+if __name__ == "__main__":
+    if "--gerar" in sys.argv:
+        print(f"Tabela gerada em {gerar_tabela_estrategia(workers=os.cpu_count())}")
+    tabela = carregar_tabela_estrategia()
+    if tabela is None:
+        print("Tabela não encontrada; gere com: python optimal_strategy.py --gerar")
+    else:
+        imprimir_tabela(tabela)
@@ -0,0 +1,82 @@
+import atexit
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import CalculadorProbabilidades
+from random_streams import FluxoAleatorio
+
+# Pool de processos persistente: criado na primeira chamada e reaproveitado
+# enquanto o número de workers não mudar, para não pagar o spawn a cada cálculo.
+_pool = None
+_workers_pool = 0
+
+def obter_pool(workers=None):
+    global _pool, _workers_pool
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or _workers_pool != workers:
+        encerrar_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _workers_pool = workers
+    return _pool
+
+def encerrar_pool():
+    global _pool, _workers_pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+        _workers_pool = 0
+
+atexit.register(encerrar_pool)
+
+def mapear(funcao, tarefas, workers=None):
+    # Os resultados voltam na ordem das tarefas, não na ordem em que terminam
+    return list(obter_pool(workers).map(funcao, tarefas))
+
+def dividir(total, partes):
+    base, resto = divmod(total, partes)
+    return [base + (1 if i < resto else 0) for i in range(partes)]
+
+def semente_base(semente=None):
+    return random.SystemRandom().getrandbits(64) if semente is None else semente
+
+def _simular_bloco(tarefa):
+    indices_jogador, indices_mesa, num_simulacoes, semente, indice, vetorizado = tarefa
+    # Cada bloco tem seu próprio fluxo, derivado de (semente, índice do bloco)
+    if vetorizado:
+        import numpy as np
+        from batch_eval import contar_resultados_lote
+        return contar_resultados_lote(indices_jogador, indices_mesa, num_simulacoes,
+                                      np.random.default_rng([semente, indice]))
+    return CalculadorProbabilidades._contar_simulacoes(indices_jogador, indices_mesa, num_simulacoes,
+                                                       FluxoAleatorio(semente).filho(indice))
+
+def _enumerar_bloco(tarefa):
+    indices_jogador, indices_mesa, runouts = tarefa
+    return CalculadorProbabilidades._contar_runouts(indices_jogador, indices_mesa, runouts)
+
+def somar_resultados(resultados):
+    return tuple(sum(parcial) for parcial in zip(*resultados))
+
+def calcular_equity_paralela(mao_jogador, cartas_comunitarias, num_simulacoes=1000, workers=None,
+                             exato=False, vetorizado=False, semente=None):
+    if not mao_jogador:
+        return {'vitoria': 0, 'empate': 0, 'derrota': 100}
+    if 52 - len(mao_jogador) - len(cartas_comunitarias) < 7:
+        return {'vitoria': 50, 'empate': 10, 'derrota': 40}
+    
+    workers = workers or os.cpu_count() or 1
+    indices_jogador = [c.indice for c in mao_jogador]
+    indices_mesa = [c.indice for c in cartas_comunitarias]
+    
+    if exato:
+        runouts = list(CalculadorProbabilidades.runouts(indices_jogador, indices_mesa))
+        tarefas = [(indices_jogador, indices_mesa, runouts[i::workers]) for i in range(min(workers, len(runouts)))]
+        resultados = mapear(_enumerar_bloco, tarefas, workers)
+    else:
+        semente = semente_base(semente)
+        tarefas = [(indices_jogador, indices_mesa, n, semente, i, vetorizado)
+                   for i, n in enumerate(dividir(num_simulacoes, workers)) if n]
+        resultados = mapear(_simular_bloco, tarefas, workers)
+    
+    return CalculadorProbabilidades._percentuais(*somar_resultados(resultados))
@@ -0,0 +1,148 @@
+import itertools
+import mmap
+import os
+import struct
+import sys
+
+# Arquivo binário com a equity exata de cada uma das 169 mãos iniciais contra
+# uma mão aleatória do dealer. Cabeçalho (magia, versão, número de registros)
+# seguido de um registro (vitórias, empates, total) por célula da grade 13x13:
+# par em [v][v], suited em [alta][baixa] e offsuit em [baixa][alta].
+ARQUIVO_PREFLOP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.bin")
+MAGIA = b"CHPF"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sII")
+REGISTRO = struct.Struct("<QQQ")
+NUM_CLASSES = 169
+
+def indice_classe(indice_a, indice_b):
+    valor_a, valor_b = indice_a % 13, indice_b % 13
+    alta, baixa = max(valor_a, valor_b), min(valor_a, valor_b)
+    if indice_a // 13 == indice_b // 13:
+        return alta * 13 + baixa
+    return baixa * 13 + alta
+
+class TabelaPreflop:
+    def __init__(self, caminho=ARQUIVO_PREFLOP):
+        with open(caminho, "rb") as arquivo:
+            self._mmap = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, versao, num_registros = CABECALHO.unpack_from(self._mmap, 0)
+        if magia != MAGIA or versao != VERSAO or num_registros != NUM_CLASSES:
+            self._mmap.close()
+            raise ValueError(f"Tabela pré-flop inválida: {caminho}")
+    
+    def contagens(self, indice_a, indice_b):
+        return REGISTRO.unpack_from(self._mmap, CABECALHO.size + REGISTRO.size * indice_classe(indice_a, indice_b))
+    
+    def equity(self, mao_jogador):
+        vitorias, empates, total = self.contagens(mao_jogador[0].indice, mao_jogador[1].indice)
+        return {
+            'vitoria': round(vitorias / total * 100, 1),
+            'empate': round(empates / total * 100, 1),
+            'derrota': round((total - vitorias - empates) / total * 100, 1)
+        }
+    
+    def fechar(self):
+        self._mmap.close()
+
+_tabela = None
+_tabela_carregada = False
+
+def carregar_tabela_preflop():
+    # Carregada uma única vez; sem o arquivo, o chamador volta para a simulação
+    global _tabela, _tabela_carregada
+    if not _tabela_carregada:
+        _tabela_carregada = True
+        try:
+            _tabela = TabelaPreflop()
+        except (OSError, ValueError):
+            _tabela = None
+    return _tabela
+
+def _boards_canonicos():
+    # Dois boards são equivalentes se diferem só por uma troca de naipes: a
+    # máscara de 52 bits com os 4 blocos de 13 bits ordenados é a forma canônica.
+    import numpy as np
+    
+    total = 2598960
+    boards = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(52), 5)),
+                         dtype=np.int64, count=total * 5).reshape(total, 5)
+    blocos = np.zeros((total, 4), dtype=np.int64)
+    linhas = np.arange(total)
+    for coluna in range(5):
+        cartas = boards[:, coluna]
+        blocos[linhas, cartas // 13] |= 1 << (cartas % 13)
+    del boards
+    blocos.sort(axis=1)
+    mascaras = blocos[:, 0] | blocos[:, 1] << 13 | blocos[:, 2] << 26 | blocos[:, 3] << 39
+    canonicas, pesos = np.unique(mascaras, return_counts=True)
+    bits = (canonicas[:, None] >> np.arange(52)) & 1
+    return np.nonzero(bits)[1].reshape(-1, 5), canonicas, pesos
+
+def _contar_por_linha(valores, consultas, linhas_consulta):
+    # Para cada consulta, quantos valores da sua linha são menores e iguais
+    import numpy as np
+    
+    largura = valores.shape[-1]
+    deslocamento = np.int64(1) << 31
+    ordenados = (np.sort(valores.reshape(-1, largura), axis=1)
+                 + np.arange(valores.size // largura, dtype=np.int64)[:, None] * deslocamento).ravel()
+    alvo = consultas + linhas_consulta * deslocamento
+    inicio = linhas_consulta * largura
+    menores = np.searchsorted(ordenados, alvo, "left") - inicio
+    iguais = np.searchsorted(ordenados, alvo, "right") - inicio - menores
+    return menores, iguais
+
+def gerar_tabela_preflop(caminho=ARQUIVO_PREFLOP, tamanho_bloco=512):
+    import numpy as np
+    from batch_eval import CHAVES, forcas_lote
+    
+    # Para cada board canônico, avalia as 1326 mãos de 2 cartas e conta, para
+    # cada mão, as mãos do dealer disjuntas que ela vence/empata (inclusão-
+    # exclusão sobre as mãos que compartilham a carta a ou a carta b).
+    boards, mascaras_boards, pesos = _boards_canonicos()
+    maos = np.array(list(itertools.combinations(range(52), 2)), dtype=np.int64)
+    chaves_maos = CHAVES[maos].sum(axis=1)
+    bits_maos = (np.int64(1) << maos[:, 0]) | (np.int64(1) << maos[:, 1])
+    contem = np.array([np.nonzero((maos == c).any(axis=1))[0] for c in range(52)])
+    invalido = np.int64(1) << 30
+    
+    vitorias = np.zeros(len(maos), dtype=np.int64)
+    empates = np.zeros(len(maos), dtype=np.int64)
+    casos = np.zeros(len(maos), dtype=np.int64)
+    
+    for inicio in range(0, len(boards), tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, len(boards))
+        k = fim - inicio
+        bits_board = mascaras_boards[inicio:fim]
+        peso = pesos[inicio:fim].astype(np.int64)[:, None]
+        
+        validas = (bits_board[:, None] & bits_maos[None, :]) == 0
+        forcas = np.full((k, len(maos)), invalido, dtype=np.int64)
+        chaves = CHAVES[boards[inicio:fim]].sum(axis=1)[:, None] + chaves_maos[None, :]
+        forcas[validas] = forcas_lote(chaves[validas], (bits_board[:, None] | bits_maos[None, :])[validas])
+        
+        linhas = np.repeat(np.arange(k, dtype=np.int64), len(maos))
+        menores, iguais = _contar_por_linha(forcas, forcas.ravel(), linhas)
+        por_carta = forcas[:, contem]
+        menores_a, iguais_a = _contar_por_linha(por_carta, forcas.ravel(), (linhas * 52 + np.tile(maos[:, 0], k)))
+        menores_b, iguais_b = _contar_por_linha(por_carta, forcas.ravel(), (linhas * 52 + np.tile(maos[:, 1], k)))
+        
+        v = (menores - menores_a - menores_b).reshape(k, -1)
+        e = (iguais - iguais_a - iguais_b + 1).reshape(k, -1)
+        vitorias += np.where(validas, v * peso, 0).sum(axis=0)
+        empates += np.where(validas, e * peso, 0).sum(axis=0)
+        casos += np.where(validas, 990 * peso, 0).sum(axis=0)
+    
+    classes = np.array([indice_classe(a, b) for a, b in maos])
+    totais = np.zeros((NUM_CLASSES, 3), dtype=np.int64)
+    np.add.at(totais, classes, np.stack([vitorias, empates, casos], axis=1))
+    
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGIA, VERSAO, NUM_CLASSES))
+        for vitorias_classe, empates_classe, total_classe in totais.tolist():
+            arquivo.write(REGISTRO.pack(vitorias_classe, empates_classe, total_classe))
+    return caminho
+
+if __name__ == "__main__":
+    print(f"Tabela gerada em {gerar_tabela_preflop(*sys.argv[1:2])}")
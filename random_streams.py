@@ -0,0 +1,28 @@
+import random
+
+# Fluxos aleatórios com semente e divisíveis: o fluxo (semente, i, j, ...) é um
+# random.Random (Mersenne Twister em C) semeado com "semente:i:j", então cada
+# worker, mesa ou bloco de simulação recebe um fluxo próprio e reprodutível que
+# não depende de quantos números os outros consumiram.
+class FluxoAleatorio(random.Random):
+    def __init__(self, semente=None, caminho=()):
+        if semente is None:
+            semente = random.SystemRandom().getrandbits(64)
+        self.semente = semente
+        self.caminho = tuple(caminho)
+        self._proximo_filho = 0
+        super().__init__(":".join(str(parte) for parte in (semente,) + self.caminho))
+    
+    def filho(self, indice):
+        # Sempre o mesmo fluxo para o mesmo índice
+        return FluxoAleatorio(self.semente, self.caminho + (indice,))
+    
+    def dividir(self, n):
+        # n fluxos novos, continuando a numeração dos já criados
+        filhos = [self.filho(self._proximo_filho + i) for i in range(n)]
+        self._proximo_filho += n
+        return filhos
+    
+    def __reduce__(self):
+        # Atravessa processos (ProcessPoolExecutor) com a semente e o estado
+        return (self.__class__, (self.semente, self.caminho), self.getstate())
@@ -0,0 +1,373 @@
+import itertools
+import math
+import re
+import sys
+
+from game_logic import CalculadorProbabilidades
+from preflop_table import NUM_CLASSES, indice_classe
+
+# Ranges de mãos: um range é um dict {índice do combo: peso}, com os 1326 combos
+# de 2 cartas numerados na ordem de itertools.combinations(range(52), 2).
+# Notação: "AA", "AKs", "AKo", "AK", "TT+", "A9s+", "22-55", "A2s-A5s", "AsKh",
+# "top 20%", "aleatoria" e peso opcional em cada item ("AKo:0.5").
+VALORES_RANGE = "23456789TJQKA"
+NAIPES_RANGE = "cdhs"  # mesma ordem de Naipe: paus, ouros, copas, espadas
+COMBOS = list(itertools.combinations(range(52), 2))
+_INDICE_COMBO = {combo: i for i, combo in enumerate(COMBOS)}
+_COMBOS_CLASSE = [[] for _ in range(NUM_CLASSES)]
+for _i, (_a, _b) in enumerate(COMBOS):
+    _COMBOS_CLASSE[indice_classe(_a, _b)].append(_i)
+
+_ranking_classes = None
+
+def combo(indice_a, indice_b):
+    return _INDICE_COMBO[(min(indice_a, indice_b), max(indice_a, indice_b))]
+
+def classe(valor_alto, valor_baixo, tipo=None):
+    # Índice da célula 13x13 (valores 0-12); tipo "s" suited, "o" offsuit, None para par
+    if valor_alto == valor_baixo:
+        return valor_alto * 13 + valor_baixo
+    alta, baixa = max(valor_alto, valor_baixo), min(valor_alto, valor_baixo)
+    return alta * 13 + baixa if tipo == "s" else baixa * 13 + alta
+
+def interpretar_cartas(texto):
+    # "Ah7c2d" -> índices de cartas
+    texto = texto.replace("10", "T").replace(" ", "")
+    if len(texto) % 2 or not all(texto[i] in VALORES_RANGE and texto[i + 1] in NAIPES_RANGE
+                                 for i in range(0, len(texto), 2)):
+        raise ValueError(f"Cartas inválidas: {texto}")
+    return [NAIPES_RANGE.index(texto[i + 1]) * 13 + VALORES_RANGE.index(texto[i]) for i in range(0, len(texto), 2)]
+
+def range_mao(mao):
+    # Range com um único combo: a mão exata (lista de Carta ou de índices)
+    indices = [carta if isinstance(carta, int) else carta.indice for carta in mao]
+    return {combo(indices[0], indices[1]): 1.0}
+
+def range_aleatorio():
+    return dict.fromkeys(range(len(COMBOS)), 1.0)
+
+def ranking_classes():
+    # Classes da mais forte para a mais fraca pela equity pré-flop contra uma mão aleatória
+    global _ranking_classes
+    if _ranking_classes is None:
+        from preflop_table import carregar_tabela_preflop
+        tabela = carregar_tabela_preflop()
+        if tabela is None:
+            raise ValueError("Ranges \"top N%\" precisam da tabela pré-flop (python preflop_table.py)")
+        equity = []
+        for indice in range(NUM_CLASSES):
+            vitorias, empates, total = tabela.contagens(*COMBOS[_COMBOS_CLASSE[indice][0]])
+            equity.append((vitorias + empates / 2) / total)
+        _ranking_classes = sorted(range(NUM_CLASSES), key=lambda i: -equity[i])
+    return _ranking_classes
+
+def _classes_top(percentual):
+    alvo = len(COMBOS) * percentual / 100
+    classes, acumulado = [], 0
+    for indice in ranking_classes():
+        if acumulado >= alvo:
+            break
+        classes.append(indice)
+        acumulado += len(_COMBOS_CLASSE[indice])
+    return classes
+
+def _tipos(sufixo):
+    return [sufixo] if sufixo else ["s", "o"]
+
+def _classes_item(item):
+    valores = VALORES_RANGE
+    if re.fullmatch(r"([2-9TJQKA])\1\+", item):
+        v = valores.index(item[0])
+        return [classe(x, x) for x in range(v, 13)]
+    if re.fullmatch(r"([2-9TJQKA])\1-([2-9TJQKA])\2", item):
+        v1, v2 = sorted((valores.index(item[0]), valores.index(item[3])))
+        return [classe(x, x) for x in range(v1, v2 + 1)]
+    if re.fullmatch(r"([2-9TJQKA])\1", item):
+        v = valores.index(item[0])
+        return [classe(v, v)]
+    
+    encontrado = re.fullmatch(r"([2-9TJQKA])([2-9TJQKA])([so]?)\+", item)
+    if encontrado:
+        alta, baixa = valores.index(encontrado[1]), valores.index(encontrado[2])
+        if baixa >= alta:
+            raise ValueError(f"Item de range inválido: {item}")
+        return [classe(alta, x, t) for x in range(baixa, alta) for t in _tipos(encontrado[3])]
+    encontrado = re.fullmatch(r"([2-9TJQKA])([2-9TJQKA])([so]?)-([2-9TJQKA])([2-9TJQKA])([so]?)", item)
+    if encontrado:
+        alta, baixa1, baixa2 = (valores.index(encontrado[i]) for i in (1, 2, 5))
+        if encontrado[1] != encontrado[4] or encontrado[3] != encontrado[6] or max(baixa1, baixa2) >= alta:
+            raise ValueError(f"Item de range inválido: {item}")
+        return [classe(alta, x, t) for x in range(min(baixa1, baixa2), max(baixa1, baixa2) + 1)
+                for t in _tipos(encontrado[3])]
+    encontrado = re.fullmatch(r"([2-9TJQKA])([2-9TJQKA])([so]?)", item)
+    if encontrado and encontrado[1] != encontrado[2]:
+        alta, baixa = valores.index(encontrado[1]), valores.index(encontrado[2])
+        return [classe(alta, baixa, t) for t in _tipos(encontrado[3])]
+    raise ValueError(f"Item de range inválido: {item}")
+
+def interpretar_range(texto):
+    # Itens separados por vírgula; um combo repetido fica com o último peso
+    resultado = {}
+    for item in texto.replace("10", "T").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        peso = 1.0
+        if ":" in item:
+            item, peso_texto = item.rsplit(":", 1)
+            peso = float(peso_texto)
+            item = item.strip()
+        if peso < 0:
+            raise ValueError(f"Peso negativo no range: {item}")
+        
+        percentual = re.fullmatch(r"(?:top\s*)?(\d+(?:\.\d+)?)%", item.lower())
+        if item.lower() in ("aleatoria", "aleatória", "random"):
+            combos = range(len(COMBOS))
+        elif percentual:
+            combos = [i for c in _classes_top(float(percentual[1])) for i in _COMBOS_CLASSE[c]]
+        elif re.fullmatch(r"[2-9TJQKA][cdhs][2-9TJQKA][cdhs]", item):
+            indices = interpretar_cartas(item)
+            if indices[0] == indices[1]:
+                raise ValueError(f"Item de range inválido: {item}")
+            combos = [combo(*indices)]
+        else:
+            combos = [i for c in _classes_item(item) for i in _COMBOS_CLASSE[c]]
+        for i in combos:
+            resultado[i] = peso
+    return {i: peso for i, peso in resultado.items() if peso > 0}
+
+def _normalizar_range(valor):
+    if isinstance(valor, str):
+        return interpretar_range(valor)
+    if isinstance(valor, dict):
+        return {i: float(peso) for i, peso in valor.items() if peso > 0}
+    return range_mao(valor)
+
+def _ordenar_linhas(valores, pesos):
+    # Ordena cada linha e guarda as somas acumuladas dos pesos na ordem ordenada
+    import numpy as np
+    
+    largura = valores.shape[-1]
+    valores = valores.reshape(-1, largura)
+    ordem = np.argsort(valores, axis=1, kind="stable")
+    deslocamento = np.int64(1) << 31
+    ordenados = (np.take_along_axis(valores, ordem, axis=1)
+                 + np.arange(len(valores), dtype=np.int64)[:, None] * deslocamento).ravel()
+    acumulados = np.zeros((len(valores), largura + 1))
+    np.cumsum(np.take_along_axis(pesos.reshape(-1, largura), ordem, axis=1), axis=1, out=acumulados[:, 1:])
+    return ordenados, acumulados, largura, deslocamento
+
+def _somar_por_linha(ordenacao, consultas, linhas):
+    # Para cada consulta, soma dos pesos dos valores da sua linha menores e iguais a ela
+    import numpy as np
+    
+    ordenados, acumulados, largura, deslocamento = ordenacao
+    alvo = consultas + linhas * deslocamento
+    esquerda = np.searchsorted(ordenados, alvo, "left") - linhas * largura
+    direita = np.searchsorted(ordenados, alvo, "right") - linhas * largura
+    menores = acumulados[linhas, esquerda]
+    return menores, acumulados[linhas, direita] - menores
+
+def _contar_duelo(forcas, validas, dados):
+    # Dois ranges numa leva de boards: soma, para cada combo do primeiro, o peso dos
+    # combos do segundo disjuntos dele que ele vence, empata e o total (inclusão-
+    # exclusão sobre os combos do segundo range que contêm cada uma das suas cartas)
+    import numpy as np
+    
+    (posicoes1, pesos1), (posicoes2, pesos2) = dados['ranges']
+    cartas1, contem2, mesmo = dados['cartas1'], dados['contem2'], dados['mesmo']
+    k, m1 = len(forcas), len(posicoes1)
+    
+    forcas1 = forcas[:, posicoes1]
+    peso1 = np.where(validas[:, posicoes1], pesos1, 0.0).ravel()
+    forcas2 = forcas[:, posicoes2]
+    peso2 = np.where(validas[:, posicoes2], pesos2, 0.0)
+    
+    consultas = forcas1.ravel()
+    linhas = np.repeat(np.arange(k, dtype=np.int64), m1)
+    vence, empata = _somar_por_linha(_ordenar_linhas(forcas2, peso2), consultas, linhas)
+    total = peso2.sum(axis=1)[linhas]
+    
+    forcas_carta = forcas2[:, contem2]
+    pesos_carta = np.where(contem2 >= 0, peso2[:, contem2], 0.0)
+    totais_carta = pesos_carta.sum(axis=2).ravel()
+    ordenacao = _ordenar_linhas(forcas_carta, pesos_carta)
+    for cartas in cartas1:
+        linhas_carta = linhas * 52 + np.tile(cartas, k)
+        menores, iguais = _somar_por_linha(ordenacao, consultas, linhas_carta)
+        vence -= menores
+        empata -= iguais
+        total -= totais_carta[linhas_carta]
+    
+    # O mesmo combo nos dois ranges foi descontado pelas duas cartas
+    proprio = np.where(mesmo >= 0, peso2[:, mesmo], 0.0).ravel()
+    empata += proprio
+    total += proprio
+    vence, empata, total = (peso1 * vence).sum(), (peso1 * empata).sum(), (peso1 * total).sum()
+    return np.array([[vence, empata, total - vence - empata], [total - vence - empata, empata, vence]]), total
+
+def _contar_multiplos(forcas, validas, dados, amostras, rng):
+    # Três ou mais ranges: em cada board, sorteia combos de cada range pelos pesos e
+    # descarta as amostras com cartas repetidas; as forças vêm da avaliação compartilhada
+    import numpy as np
+    
+    k = len(forcas)
+    linhas = np.arange(k)[:, None]
+    bits = dados['bits']
+    usados = np.zeros((k, amostras), dtype=np.int64)
+    aceitas = np.ones((k, amostras), dtype=bool)
+    forcas_jogadores = []
+    for posicoes, pesos in dados['ranges']:
+        acumulados = np.cumsum(pesos)
+        escolhidos = posicoes[np.searchsorted(acumulados, rng.random((k, amostras)) * acumulados[-1], "right")]
+        aceitas &= validas[linhas, escolhidos] & ((usados & bits[escolhidos]) == 0)
+        usados |= bits[escolhidos]
+        forcas_jogadores.append(forcas[linhas, escolhidos])
+    
+    forcas_jogadores = np.stack(forcas_jogadores)
+    vencedores = (forcas_jogadores == forcas_jogadores.max(axis=0)) & aceitas
+    num_vencedores = vencedores.sum(axis=0)
+    contagem = np.stack([
+        (vencedores & (num_vencedores == 1)).sum(axis=(1, 2)),
+        (vencedores & (num_vencedores > 1)).sum(axis=(1, 2)),
+        (~vencedores & aceitas).sum(axis=(1, 2)),
+    ], axis=1).astype(float)
+    partes = np.where(vencedores, 1.0 / np.maximum(num_vencedores, 1), 0.0).sum(axis=(1, 2))
+    return contagem, float(aceitas.sum()), partes
+
+def _contar_bloco(tarefa):
+    # Avalia todos os combos da união dos ranges em cada board do bloco, uma única
+    # vez, e reparte entre os jogadores
+    import numpy as np
+    from batch_eval import BITS, CHAVES, forcas_lote
+    
+    indices_mesa, runouts, num_boards, semente, dados, amostras = tarefa
+    rng = np.random.default_rng(semente)
+    faltantes = 5 - len(indices_mesa)
+    if runouts is None:
+        restante = np.array([i for i in range(52) if i not in indices_mesa], dtype=np.int64)
+        chaves_aleatorias = rng.random((num_boards, len(restante)))
+        runouts = restante[np.argpartition(chaves_aleatorias, faltantes - 1, axis=1)[:, :faltantes]]
+    boards = np.concatenate([np.tile(np.array(indices_mesa, dtype=np.int64), (len(runouts), 1)), runouts], axis=1)
+    
+    combos = dados['combos']
+    chaves_boards = CHAVES[boards].sum(axis=1)
+    bits_boards = np.bitwise_or.reduce(BITS[boards], axis=1)
+    validas = (bits_boards[:, None] & dados['bits']) == 0
+    forcas = np.full(validas.shape, -1, dtype=np.int64)
+    forcas[validas] = forcas_lote((chaves_boards[:, None] + CHAVES[combos].sum(axis=1))[validas],
+                                  (bits_boards[:, None] | dados['bits'])[validas])
+    
+    if len(dados['ranges']) == 2:
+        contagem, total = _contar_duelo(forcas, validas, dados)
+        partes = np.array([contagem[0, 0] + contagem[0, 1] / 2, contagem[1, 0] + contagem[1, 1] / 2])
+        return contagem, total, partes
+    return _contar_multiplos(forcas, validas, dados, amostras, rng)
+
+def _preparar(ranges, indices_mesa):
+    import numpy as np
+    
+    # Combos que usam cartas da mesa saem dos ranges; a união dos ranges é avaliada uma vez por board
+    bits_mesa = sum(1 << i for i in indices_mesa)
+    normalizados = []
+    for valor in ranges:
+        faixa = {i: peso for i, peso in _normalizar_range(valor).items()
+                 if not (1 << COMBOS[i][0] | 1 << COMBOS[i][1]) & bits_mesa}
+        if not faixa:
+            raise ValueError(f"Range vazio (ou todo bloqueado pela mesa): {valor}")
+        normalizados.append(faixa)
+    
+    uniao = sorted(set().union(*normalizados))
+    posicao = {c: i for i, c in enumerate(uniao)}
+    combos = np.array([COMBOS[c] for c in uniao], dtype=np.int64)
+    dados = {
+        'combos': combos,
+        'bits': (np.int64(1) << combos[:, 0]) | (np.int64(1) << combos[:, 1]),
+        'ranges': [(np.array([posicao[c] for c in faixa], dtype=np.int64), np.array(list(faixa.values())))
+                   for faixa in normalizados],
+    }
+    if len(normalizados) == 2:
+        primeiro, segundo = list(normalizados[0]), list(normalizados[1])
+        indice_segundo = {c: i for i, c in enumerate(segundo)}
+        por_carta = [[i for i, c in enumerate(segundo) if carta in COMBOS[c]] for carta in range(52)]
+        largura = max(1, max(len(lista) for lista in por_carta))
+        dados['cartas1'] = [np.array([COMBOS[c][0] for c in primeiro], dtype=np.int64),
+                            np.array([COMBOS[c][1] for c in primeiro], dtype=np.int64)]
+        dados['contem2'] = np.array([lista + [-1] * (largura - len(lista)) for lista in por_carta], dtype=np.int64)
+        dados['mesmo'] = np.array([indice_segundo.get(c, -1) for c in primeiro], dtype=np.int64)
+    return dados
+
+def equity_ranges(ranges, cartas_comunitarias=(), exato=None, num_boards=2000, amostras_por_board=64,
+                  semente=None, workers=None):
+    # Equity entre 2 ou mais ranges (string, dict de pesos ou mão exata). Com 2
+    # ranges cada board é comparado exatamente entre todos os pares de combos;
+    # exato=True enumera também todos os runouts (padrão a partir do flop). Com 3
+    # ou mais, os combos são sorteados em cada board (Monte Carlo).
+    import numpy as np
+    from parallel import semente_base
+    
+    if len(ranges) < 2:
+        raise ValueError("São necessários pelo menos 2 ranges")
+    indices_mesa = [c if isinstance(c, int) else c.indice for c in cartas_comunitarias]
+    if exato is None:
+        exato = len(ranges) == 2 and len(indices_mesa) >= 3
+    if exato and len(ranges) > 2:
+        raise ValueError("A enumeração exata é só para 2 ranges; use Monte Carlo para mais jogadores")
+    
+    dados = _preparar(ranges, indices_mesa)
+    semente = semente_base(semente)
+    por_bloco = max(1, (1 << 18) // max(len(dados['combos']), amostras_por_board * len(ranges)))
+    if exato:
+        restante = [i for i in range(52) if i not in indices_mesa]
+        faltantes = 5 - len(indices_mesa)
+        num_runouts = math.comb(len(restante), faltantes)
+        runouts = np.fromiter(itertools.chain.from_iterable(itertools.combinations(restante, faltantes)),
+                              dtype=np.int64, count=num_runouts * faltantes).reshape(num_runouts, faltantes)
+        tarefas = [(indices_mesa, runouts[i:i + por_bloco], None, (semente, n), dados, amostras_por_board)
+                   for n, i in enumerate(range(0, num_runouts, por_bloco))]
+    elif len(indices_mesa) == 5:
+        tarefas = [(indices_mesa, np.zeros((1, 0), dtype=np.int64), None, (semente, 0), dados,
+                    amostras_por_board * num_boards)]
+    else:
+        tarefas = [(indices_mesa, None, min(por_bloco, num_boards - i), (semente, n), dados, amostras_por_board)
+                   for n, i in enumerate(range(0, num_boards, por_bloco))]
+    
+    if workers and workers > 1:
+        from parallel import mapear
+        resultados = mapear(_contar_bloco, tarefas, workers)
+    else:
+        resultados = [_contar_bloco(tarefa) for tarefa in tarefas]
+    contagem = sum(r[0] for r in resultados)
+    casos = float(sum(r[1] for r in resultados))
+    if not casos:
+        raise ValueError("Os ranges nunca podem ser distribuídos juntos (combos em conflito entre si ou com a mesa)")
+    partes = sum(r[2] for r in resultados)
+    
+    jogadores = []
+    for (vitorias, empates, derrotas), parte in zip(contagem.tolist(), partes.tolist()):
+        resultado = CalculadorProbabilidades._percentuais(vitorias, empates, derrotas)
+        resultado['equity'] = round(parte / casos * 100, 2)
+        jogadores.append(resultado)
+    return {
+        'jogadores': jogadores,
+        'casos': casos,
+        'boards': sum(len(t[1]) if t[1] is not None else t[2] for t in tarefas),
+        'exato': exato,
+    }
+
+if __name__ == "__main__":
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+    opcoes = dict(argumento[2:].split("=", 1) for argumento in sys.argv[1:]
+                  if argumento.startswith("--") and "=" in argumento)
+    if len(argumentos) < 2:
+        print('uso: python ranges.py "AA,KK,AKs" "top 20%" [...] [--mesa=Ah7c2d] [--exato] [--boards=N]')
+        sys.exit(1)
+    mesa = interpretar_cartas(opcoes['mesa']) if 'mesa' in opcoes else []
+    resultado = equity_ranges(argumentos, mesa, exato=True if "--exato" in sys.argv else None,
+                              num_boards=int(opcoes.get('boards', 2000)),
+                              semente=int(opcoes['semente']) if 'semente' in opcoes else None)
+    print(f"{'exato' if resultado['exato'] else 'Monte Carlo'}: {resultado['boards']} boards, "
+          f"{resultado['casos']:.0f} casos")
+    for texto, jogador in zip(argumentos, resultado['jogadores']):
+        print(f"  {texto:30s} equity {jogador['equity']:6.2f}%  (vitória {jogador['vitoria']}%, "
+              f"empate {jogador['empate']}%)")
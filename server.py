@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import instrumentation
+from game_logic import BARALHO_COMPLETO, GameLogic
+from random_streams import FluxoAleatorio
+
+# Servidor asyncio com várias mesas (um GameLogic por mesa) num só processo.
+# Protocolo binário de tamanho fixo: o pedido é (operação, mesa) e a resposta
+# é sempre o estado da mesa, com as cartas como índices 0-51 (255 = sem carta)
+# e a equity em décimos de ponto percentual (0xFFFF = ainda não calculada).
+# As stats rodam num executor compartilhado e nunca bloqueiam o loop.
+PORTA_PADRAO = 7650
+PEDIDO = struct.Struct("<BI")
+# (status, mesa, fase, fichas, jogos, vitórias, 9 cartas, vitória, empate, derrota, outs)
+RESPOSTA = struct.Struct("<BIBiII9s3HB")
+
+NOVA_MESA, INICIAR, CALL, FOLD, ESTADO, STATS, FECHAR = range(1, 8)
+OK, MESA_DESCONHECIDA, ACAO_RECUSADA, OPERACAO_INVALIDA = range(4)
+
+FASES = ["INICIO", "PRE_FLOP", "FLOP", "TURN", "RIVER", "FIM"]
+_CODIGO_FASE = {fase: i for i, fase in enumerate(FASES)}
+SEM_CARTA = 255
+SEM_VALOR = 0xFFFF
+SEM_OUTS = 255
+_CARTAS_VAZIAS = bytes([SEM_CARTA] * 9)
+
+def _bytes_cartas(cartas, tamanho):
+    return bytes([carta.indice for carta in cartas] + [SEM_CARTA] * (tamanho - len(cartas)))
+
+def empacotar_estado(status, id_mesa, jogo=None):
+    if jogo is None:
+        return RESPOSTA.pack(status, id_mesa, 0, 0, 0, 0, _CARTAS_VAZIAS, SEM_VALOR, SEM_VALOR, SEM_VALOR, SEM_OUTS)
+    
+    # Como na interface, as cartas do dealer só aparecem no fim da rodada
+    mao_dealer = jogo.mao_dealer if jogo.fase == "FIM" else []
+    cartas = (_bytes_cartas(jogo.mao_jogador, 2) + _bytes_cartas(mao_dealer, 2)
+              + _bytes_cartas(jogo.cartas_comunitarias, 5))
+    
+    stats = jogo.stats
+    if stats:
+        percentuais = [round(stats[chave] * 10) for chave in ('vitoria', 'empate', 'derrota')]
+        outs = SEM_OUTS if stats.get('outs') is None else stats['outs']
+    else:
+        percentuais = [SEM_VALOR] * 3
+        outs = SEM_OUTS
+    return RESPOSTA.pack(status, id_mesa, _CODIGO_FASE[jogo.fase], jogo.fichas, jogo.total_jogos,
+                         jogo.total_vitorias, cartas, *percentuais, outs)
+
+def desempacotar_estado(dados):
+    status, id_mesa, fase, fichas, jogos, vitorias, cartas, vitoria, empate, derrota, outs = RESPOSTA.unpack(dados)
+    
+    def lista(trecho):
+        return [BARALHO_COMPLETO[i] for i in trecho if i != SEM_CARTA]
+    
+    stats = None
+    if vitoria != SEM_VALOR:
+        stats = {
+            'vitoria': vitoria / 10,
+            'empate': empate / 10,
+            'derrota': derrota / 10,
+            'outs': None if outs == SEM_OUTS else outs,
+        }
+    return {
+        'status': status,
+        'mesa': id_mesa,
+        'fase': FASES[fase],
+        'fichas': fichas,
+        'total_jogos': jogos,
+        'total_vitorias': vitorias,
+        'mao_jogador': lista(cartas[:2]),
+        'mao_dealer': lista(cartas[2:4]),
+        'cartas_comunitarias': lista(cartas[4:]),
+        'stats': stats,
+    }
+
+class ServidorMesas:
+    def __init__(self, workers_stats=None):
+        self.mesas = {}
+        self.pedidos = 0
+        self._proximo_id = 1
+        self.executor = ThreadPoolExecutor(max_workers=workers_stats or os.cpu_count() or 1,
+                                           thread_name_prefix="stats")
+    
+    def processar(self, operacao, id_mesa):
+        # Tudo aqui é rápido: o único trabalho pesado (stats) vai para o executor
+        self.pedidos += 1
+        if operacao == NOVA_MESA:
+            id_mesa = self._proximo_id
+            self._proximo_id += 1
+            self.mesas[id_mesa] = GameLogic(executor_stats=self.executor)
+            return empacotar_estado(OK, id_mesa, self.mesas[id_mesa])
+        
+        jogo = self.mesas.get(id_mesa)
+        if jogo is None:
+            return empacotar_estado(MESA_DESCONHECIDA, id_mesa)
+        
+        status = OK
+        fase = jogo.fase
+        if operacao == INICIAR:
+            if not jogo.iniciar_rodada():
+                status = ACAO_RECUSADA
+        elif operacao in (CALL, FOLD):
+            # Ação fora de hora ou sem fichas para o CALL: a fase não muda
+            if operacao == CALL:
+                jogo.call()
+            else:
+                jogo.fold()
+            if jogo.fase == fase:
+                status = ACAO_RECUSADA
+        elif operacao == FECHAR:
+            jogo.cancelar_stats()
+            del self.mesas[id_mesa]
+        elif operacao not in (ESTADO, STATS):
+            status = OPERACAO_INVALIDA
+        return empacotar_estado(status, id_mesa, jogo)
+    
+    async def aguardar_stats(self, id_mesa):
+        jogo = self.mesas.get(id_mesa)
+        futuro = jogo.stats_futuro if jogo is not None else None
+        if futuro is not None:
+            # asyncio.wait não propaga o cancelamento de um cálculo substituído
+            await asyncio.wait([asyncio.wrap_future(futuro)])
+    
+    async def atender(self, leitor, escritor):
+        try:
+            while True:
+                operacao, id_mesa = PEDIDO.unpack(await leitor.readexactly(PEDIDO.size))
+                if operacao == STATS:
+                    await self.aguardar_stats(id_mesa)
+                escritor.write(self.processar(operacao, id_mesa))
+                await escritor.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+    
+    async def iniciar(self, host="127.0.0.1", porta=PORTA_PADRAO, caminho_unix=None):
+        if caminho_unix:
+            return await asyncio.start_unix_server(self.atender, caminho_unix)
+        return await asyncio.start_server(self.atender, host, porta)
+    
+    def fechar(self):
+        for jogo in self.mesas.values():
+            jogo.cancelar_stats()
+        self.mesas.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class ClienteMesas:
+    def __init__(self, leitor, escritor):
+        self.leitor = leitor
+        self.escritor = escritor
+    
+    @classmethod
+    async def conectar(cls, host="127.0.0.1", porta=PORTA_PADRAO, caminho_unix=None):
+        if caminho_unix:
+            return cls(*await asyncio.open_unix_connection(caminho_unix))
+        return cls(*await asyncio.open_connection(host, porta))
+    
+    async def pedir(self, operacao, id_mesa=0):
+        self.escritor.write(PEDIDO.pack(operacao, id_mesa))
+        return desempacotar_estado(await self.leitor.readexactly(RESPOSTA.size))
+    
+    async def nova_mesa(self):
+        return await self.pedir(NOVA_MESA)
+    
+    async def iniciar_rodada(self, id_mesa):
+        return await self.pedir(INICIAR, id_mesa)
+    
+    async def call(self, id_mesa):
+        return await self.pedir(CALL, id_mesa)
+    
+    async def fold(self, id_mesa):
+        return await self.pedir(FOLD, id_mesa)
+    
+    async def estado(self, id_mesa):
+        return await self.pedir(ESTADO, id_mesa)
+    
+    async def stats(self, id_mesa):
+        return await self.pedir(STATS, id_mesa)
+    
+    async def fechar_mesa(self, id_mesa):
+        return await self.pedir(FECHAR, id_mesa)
+    
+    async def fechar(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+
+async def gerar_carga(num_conexoes=20, mesas_por_conexao=10, rodadas=20, pedir_stats=False, semente=None,
+                      host="127.0.0.1", porta=PORTA_PADRAO, caminho_unix=None):
+    # Cada conexão joga suas mesas em sequência (CALL em ~80% das mãos) e mede a
+    # latência de cada pedido, da escrita até a resposta completa
+    latencias = []
+    contagem = {'rodadas': 0}
+    fluxo = FluxoAleatorio(semente)
+    
+    async def conexao(indice):
+        rng = fluxo.filho(indice)
+        cliente = await ClienteMesas.conectar(host, porta, caminho_unix)
+        
+        async def pedir(operacao, id_mesa=0):
+            inicio = time.perf_counter()
+            estado = await cliente.pedir(operacao, id_mesa)
+            latencias.append(time.perf_counter() - inicio)
+            return estado
+        
+        mesas = [(await pedir(NOVA_MESA))['mesa'] for _ in range(mesas_por_conexao)]
+        for _ in range(rodadas):
+            for i, id_mesa in enumerate(mesas):
+                estado = await pedir(INICIAR, id_mesa)
+                if estado['status'] == ACAO_RECUSADA:
+                    # Sem fichas: troca a mesa por uma nova
+                    await pedir(FECHAR, id_mesa)
+                    id_mesa = mesas[i] = (await pedir(NOVA_MESA))['mesa']
+                    estado = await pedir(INICIAR, id_mesa)
+                if pedir_stats:
+                    await pedir(STATS, id_mesa)
+                if rng.random() < 0.8:
+                    while estado['fase'] != "FIM":
+                        estado = await pedir(CALL, id_mesa)
+                        if estado['status'] == ACAO_RECUSADA:
+                            break
+                if estado['fase'] != "FIM":
+                    await pedir(FOLD, id_mesa)
+                contagem['rodadas'] += 1
+        for id_mesa in mesas:
+            await pedir(FECHAR, id_mesa)
+        await cliente.fechar()
+    
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexao(i) for i in range(num_conexoes)))
+    duracao = time.perf_counter() - inicio
+    
+    latencias.sort()
+    return {
+        'conexoes': num_conexoes,
+        'mesas': num_conexoes * mesas_por_conexao,
+        'pedidos': len(latencias),
+        'rodadas': contagem['rodadas'],
+        'segundos': duracao,
+        'pedidos_por_segundo': len(latencias) / duracao,
+        'rodadas_por_segundo': contagem['rodadas'] / duracao,
+        'latencia_p50_ms': instrumentation.percentil(latencias, 0.50) * 1000,
+        'latencia_p99_ms': instrumentation.percentil(latencias, 0.99) * 1000,
+        'latencia_max_ms': latencias[-1] * 1000 if latencias else 0.0,
+    }
+
+async def carga_local(**opcoes):
+    # Servidor e gerador de carga no mesmo loop, numa porta livre qualquer
+    servidor = ServidorMesas()
+    socket_servidor = await servidor.iniciar(porta=0)
+    porta = socket_servidor.sockets[0].getsockname()[1]
+    try:
+        return await gerar_carga(porta=porta, **opcoes)
+    finally:
+        socket_servidor.close()
+        await socket_servidor.wait_closed()
+        servidor.fechar()
+
+async def servir(host, porta, caminho_unix):
+    servidor = ServidorMesas()
+    socket_servidor = await servidor.iniciar(host, porta, caminho_unix)
+    print(f"Servidor de mesas em {caminho_unix or f'{host}:{porta}'}")
+    try:
+        async with socket_servidor:
+            await socket_servidor.serve_forever()
+    finally:
+        servidor.fechar()
+
+def imprimir_carga(relatorio):
+    print(f"{relatorio['conexoes']} conexões, {relatorio['mesas']} mesas: {relatorio['pedidos']} pedidos e "
+          f"{relatorio['rodadas']} rodadas em {relatorio['segundos']:.2f}s")
+    print(f"Vazão: {relatorio['pedidos_por_segundo']:.0f} pedidos/s, {relatorio['rodadas_por_segundo']:.0f} rodadas/s")
+    print(f"Latência: p50 {relatorio['latencia_p50_ms']:.2f} ms | p99 {relatorio['latencia_p99_ms']:.2f} ms | "
+          f"máx {relatorio['latencia_max_ms']:.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de mesas do Casino Hold'em")
+    parser.add_argument("comando", choices=["servir", "carga"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--unix", help="caminho de um socket Unix em vez de TCP")
+    parser.add_argument("--local", action="store_true", help="carga: sobe o servidor no mesmo processo")
+    parser.add_argument("--conexoes", type=int, default=20)
+    parser.add_argument("--mesas", type=int, default=10, help="mesas por conexão")
+    parser.add_argument("--rodadas", type=int, default=20, help="rodadas por mesa")
+    parser.add_argument("--stats", action="store_true", help="carga: espera as stats de cada mão")
+    parser.add_argument("--semente", type=int)
+    args = parser.parse_args(argv)
+    
+    if args.comando == "servir":
+        try:
+            asyncio.run(servir(args.host, args.porta, args.unix))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    
+    opcoes = dict(num_conexoes=args.conexoes, mesas_por_conexao=args.mesas, rodadas=args.rodadas,
+                  pedir_stats=args.stats, semente=args.semente)
+    if args.local:
+        relatorio = asyncio.run(carga_local(**opcoes))
+    else:
+        relatorio = asyncio.run(gerar_carga(host=args.host, porta=args.porta, caminho_unix=args.unix, **opcoes))
+    imprimir_carga(relatorio)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import json
+import os
+import sys
+import time
+
+from game_logic import GameLogic
+from random_streams import FluxoAleatorio
+
+# Sessões gravadas: a semente do baralho e a sequência de ações do jogador (as
+# mesmas de processar_click), com o estado visível depois de cada uma. Arquivo
+# JSON Lines: um cabeçalho e uma linha por ação, gravada na hora, então uma
+# sessão interrompida continua reproduzível até a última ação.
+VERSAO = 1
+ACOES = ("nova_rodada", "call", "fold")
+CAMPOS_VERIFICADOS = ("fase", "fichas", "mensagem", "historico", "total_jogos", "total_vitorias")
+
+def aplicar_acao(jogo, acao):
+    if acao == "nova_rodada":
+        jogo.iniciar_rodada()
+    elif acao == "call":
+        jogo.call()
+    elif acao == "fold":
+        jogo.fold()
+    else:
+        raise ValueError(f"Ação desconhecida: {acao}")
+
+def estado_visivel(jogo):
+    return {
+        'fase': jogo.fase,
+        'fichas': jogo.fichas,
+        'mensagem': jogo.mensagem,
+        'historico': [dict(item) for item in jogo.historico],
+        'total_jogos': jogo.total_jogos,
+        'total_vitorias': jogo.total_vitorias,
+    }
+
+class GravadorSessao:
+    def __init__(self, caminho, semente, fichas=1000, aposta_ante=10):
+        self.caminho = caminho
+        self.num_acoes = 0
+        self._arquivo = open(caminho, "w", encoding="utf-8")
+        self._escrever({'versao': VERSAO, 'semente': semente, 'fichas': fichas, 'ante': aposta_ante})
+    
+    def _escrever(self, linha):
+        self._arquivo.write(json.dumps(linha, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+    
+    def registrar(self, acao, jogo):
+        self._escrever(dict(estado_visivel(jogo), acao=acao))
+        self.num_acoes += 1
+    
+    def fechar(self):
+        if not self._arquivo.closed:
+            self._arquivo.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+def ler_sessao(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        linhas = [json.loads(linha) for linha in arquivo if linha.strip()]
+    if not linhas or linhas[0].get('versao') != VERSAO:
+        raise ValueError(f"Sessão inválida: {caminho}")
+    return linhas[0], linhas[1:]
+
+def criar_jogo(semente, fichas=1000, aposta_ante=10, calcular_stats=True, registro=None):
+    # O mesmo jogo para gravar e para reproduzir: baralho com o fluxo da semente
+    jogo = GameLogic(stats_em_segundo_plano=calcular_stats, registro=registro, rng=FluxoAleatorio(semente),
+                     calcular_stats=calcular_stats)
+    jogo.fichas = fichas
+    jogo.aposta_ante = aposta_ante
+    return jogo
+
+def reproduzir_sessao(caminho, max_divergencias=10):
+    # Reaplica as ações sem interface nem stats e compara o estado depois de cada uma
+    cabecalho, acoes = ler_sessao(caminho)
+    jogo = criar_jogo(cabecalho['semente'], cabecalho['fichas'], cabecalho['ante'], calcular_stats=False)
+    divergencias = []
+    num_divergencias = 0
+    inicio = time.perf_counter()
+    for indice, esperado in enumerate(acoes):
+        aplicar_acao(jogo, esperado['acao'])
+        obtido = estado_visivel(jogo)
+        for campo in CAMPOS_VERIFICADOS:
+            if obtido[campo] != esperado[campo]:
+                num_divergencias += 1
+                if len(divergencias) < max_divergencias:
+                    divergencias.append({'acao': indice, 'campo': campo, 'esperado': esperado[campo],
+                                         'obtido': obtido[campo]})
+    segundos = time.perf_counter() - inicio
+    return {
+        'arquivo': caminho,
+        'acoes': len(acoes),
+        'rodadas': jogo.total_jogos,
+        'fichas': jogo.fichas,
+        'segundos': segundos,
+        'num_divergencias': num_divergencias,
+        'divergencias': divergencias,
+        'ok': num_divergencias == 0,
+    }
+
+def reproduzir_sessoes(caminhos, workers=None):
+    # Várias sessões ao mesmo tempo, uma por tarefa do pool de parallel.py
+    inicio = time.perf_counter()
+    workers = min(workers or os.cpu_count() or 1, len(caminhos))
+    if workers > 1:
+        from parallel import mapear
+        resultados = mapear(reproduzir_sessao, caminhos, workers)
+    else:
+        resultados = [reproduzir_sessao(caminho) for caminho in caminhos]
+    segundos = time.perf_counter() - inicio
+    acoes = sum(r['acoes'] for r in resultados)
+    return {
+        'sessoes': len(resultados),
+        'acoes': acoes,
+        'rodadas': sum(r['rodadas'] for r in resultados),
+        'divergentes': sum(1 for r in resultados if not r['ok']),
+        'segundos': segundos,
+        'acoes_por_segundo': acoes / segundos if segundos > 0 else 0.0,
+        'resultados': resultados,
+    }
+
+def gravar_sessao_sintetica(caminho, semente, num_rodadas, estrategia=None, fichas=1000):
+    # Um jogador automático clicando como na interface (para benchmarks e testes de carga)
+    from simulator import call_com_par_ou_carta_alta
+    estrategia = estrategia or call_com_par_ou_carta_alta
+    
+    jogo = criar_jogo(semente, fichas, calcular_stats=False)
+    with GravadorSessao(caminho, semente, fichas) as gravador:
+        for _ in range(num_rodadas):
+            aplicar_acao(jogo, "nova_rodada")
+            gravador.registrar("nova_rodada", jogo)
+            if jogo.fase != "PRE_FLOP":
+                break
+            acao = "call" if estrategia(jogo.mao_jogador) else "fold"
+            while jogo.fase != "FIM":
+                fase = jogo.fase
+                aplicar_acao(jogo, acao)
+                gravador.registrar(acao, jogo)
+                # CALL recusado (fichas para o ante, mas não para o CALL): a fase não muda e a mão vira FOLD
+                acao = "fold" if jogo.fase == fase else "call"
+    return caminho
+
+def imprimir_relatorio(relatorio):
+    print(f"{relatorio['sessoes']} sessões, {relatorio['acoes']} ações, {relatorio['rodadas']} rodadas em "
+          f"{relatorio['segundos']:.2f}s ({relatorio['acoes_por_segundo']:.0f} ações/s)")
+    for resultado in relatorio['resultados']:
+        if resultado['ok']:
+            continue
+        print(f"  {resultado['arquivo']}: {resultado['num_divergencias']} divergências")
+        for divergencia in resultado['divergencias']:
+            print(f"    ação {divergencia['acao']} ({divergencia['campo']}): esperado {divergencia['esperado']!r}, "
+                  f"obtido {divergencia['obtido']!r}")
+    print("OK" if not relatorio['divergentes'] else f"{relatorio['divergentes']} sessões divergentes")
+
+if __name__ == "__main__":
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+    opcoes = dict(argumento[2:].split("=", 1) for argumento in sys.argv[1:]
+                  if argumento.startswith("--") and "=" in argumento)
+    if not argumentos:
+        print("uso: python session.py sessao.jsonl [...] [--workers=N]")
+        sys.exit(1)
+    relatorio = reproduzir_sessoes(argumentos, int(opcoes['workers']) if 'workers' in opcoes else None)
+    imprimir_relatorio(relatorio)
+    sys.exit(1 if relatorio['divergentes'] else 0)
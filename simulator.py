@@ -0,0 +1,106 @@
+import math
+import sys
+import time
+
+from game_logic import BARALHO_COMPLETO, _CHAVES, AvaliadorMao, GameLogic
+from optimal_strategy import estrategia_otima
+from random_streams import FluxoAleatorio
+
+# Simulador headless: aplica as regras do GameLogic (ante, call de 2x ante,
+# qualificação do dealer em resolver_showdown) sem stats, mensagens ou
+# histórico. O baralho é um único array reaproveitado entre as rodadas e só
+# as 9 cartas usadas são embaralhadas (Fisher-Yates parcial).
+CARTAS_POR_RODADA = 9
+
+def sempre_call(mao_jogador):
+    return True
+
+def call_com_par_ou_carta_alta(mao_jogador):
+    a, b = mao_jogador
+    return a.valor_numerico == b.valor_numerico or max(a.valor_numerico, b.valor_numerico) >= 10
+
+class SimuladorRodadas:
+    def __init__(self, estrategia=sempre_call, aposta_ante=10, semente=None, registro=None, rng=None):
+        # estrategia(mao_jogador) -> True para CALL, False para FOLD
+        self.estrategia = estrategia
+        self.registro = registro
+        self.aposta_ante = aposta_ante
+        self.rng = rng if rng is not None else FluxoAleatorio(semente)
+        self.baralho = list(range(52))
+    
+    def simular(self, num_rodadas):
+        estrategia = self.estrategia
+        ante = self.aposta_ante
+        baralho = self.baralho
+        aleatorio = self.rng.random
+        chaves = _CHAVES
+        forca_chave = AvaliadorMao.forca_chave
+        resolver = GameLogic.resolver_showdown
+        registro = self.registro
+        
+        contagem = {"FOLD": 0, "NAO_QUALIFICOU": 0, "VITORIA": 0, "EMPATE": 0, "DERROTA": 0}
+        media = soma_quadrados = 0.0
+        inicio = time.perf_counter()
+        
+        for rodada in range(1, num_rodadas + 1):
+            for j in range(CARTAS_POR_RODADA):
+                k = j + int(aleatorio() * (52 - j))
+                baralho[j], baralho[k] = baralho[k], baralho[j]
+            j1, j2, d1, d2, m1, m2, m3, m4, m5 = baralho[:CARTAS_POR_RODADA]
+            
+            if estrategia((BARALHO_COMPLETO[j1], BARALHO_COMPLETO[j2])):
+                chave_mesa = chaves[m1] + chaves[m2] + chaves[m3] + chaves[m4] + chaves[m5]
+                bits_mesa = 1 << m1 | 1 << m2 | 1 << m3 | 1 << m4 | 1 << m5
+                forca_jogador = forca_chave(chave_mesa + chaves[j1] + chaves[j2], bits_mesa | 1 << j1 | 1 << j2)
+                forca_dealer = forca_chave(chave_mesa + chaves[d1] + chaves[d2], bits_mesa | 1 << d1 | 1 << d2)
+                resultado, ganho = resolver(forca_jogador, forca_dealer, ante)
+                if registro is not None:
+                    registro.registrar_indices((j1, j2), (d1, d2), (m1, m2, m3, m4, m5), resultado, ganho, ante,
+                                               forca_jogador, forca_dealer)
+            else:
+                resultado, ganho = "FOLD", -ante
+                if registro is not None:
+                    registro.registrar_indices((j1, j2), (d1, d2), (), resultado, ganho, ante)
+            contagem[resultado] += 1
+            
+            # Welford: média e variância sem guardar os ganhos
+            delta = ganho - media
+            media += delta / rodada
+            soma_quadrados += delta * (ganho - media)
+        
+        duracao = time.perf_counter() - inicio
+        variancia = soma_quadrados / (num_rodadas - 1) if num_rodadas > 1 else 0.0
+        return {
+            'rodadas': num_rodadas,
+            'segundos': duracao,
+            'rodadas_por_segundo': num_rodadas / duracao if duracao > 0 else 0.0,
+            'ev': media,
+            'ev_por_ante': media / ante,
+            'variancia': variancia,
+            'desvio_padrao': math.sqrt(variancia),
+            'erro_padrao': math.sqrt(variancia / num_rodadas) if num_rodadas else 0.0,
+            'resultados': contagem,
+        }
+
+def imprimir_relatorio(relatorio):
+    print(f"Rodadas: {relatorio['rodadas']} em {relatorio['segundos']:.2f}s "
+          f"({relatorio['rodadas_por_segundo']:.0f} rodadas/s)")
+    print(f"EV por rodada: {relatorio['ev']:+.4f} fichas ({relatorio['ev_por_ante'] * 100:+.3f}% do ante) "
+          f"± {relatorio['erro_padrao']:.4f}")
+    print(f"Variância: {relatorio['variancia']:.2f} (desvio padrão {relatorio['desvio_padrao']:.2f})")
+    for resultado, n in relatorio['resultados'].items():
+        print(f"  {resultado}: {n} ({n / relatorio['rodadas'] * 100:.2f}%)")
+
+if __name__ == "__main__":
+    # --otima: decide pela tabela exata de optimal_strategy.py em vez de pagar sempre
+    estrategia = estrategia_otima if "--otima" in sys.argv else sempre_call
+    argumentos = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+    num_rodadas = int(argumentos[0]) if len(argumentos) > 0 else 1000000
+    semente = int(argumentos[1]) if len(argumentos) > 1 else None
+    if len(argumentos) > 2:
+        # Terceiro argumento: grava todas as rodadas num histórico (hand_log.py)
+        from hand_log import RegistroMaos
+        with RegistroMaos(argumentos[2]) as registro:
+            imprimir_relatorio(SimuladorRodadas(estrategia, semente=semente, registro=registro).simular(num_rodadas))
+    else:
+        imprimir_relatorio(SimuladorRodadas(estrategia, semente=semente).simular(num_rodadas))
@@ -0,0 +1,73 @@
+import array
+import os
+import struct
+import sys
+
+# Tabelas grandes construídas na primeira vez que são usadas e guardadas em
+# disco, uma por arquivo "<nome>_v<versão>.bin": cabeçalho (magia, versão,
+# número de arrays) e, para cada array, o typecode e o tamanho seguidos dos
+# dados. Mudou o conteúdo de uma tabela: sobe a versão e o arquivo antigo é
+# ignorado. CASINO_HOLDEM_TABELAS troca o diretório (workers, testes, CI).
+DIRETORIO_TABELAS = os.environ.get("CASINO_HOLDEM_TABELAS") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".tabelas")
+# Arquivos que o jogo grava enquanto roda (cache de equity, histórico de mãos,
+# perfis): fora do diretório de trabalho, num diretório ignorado pelo git.
+# CASINO_HOLDEM_DADOS troca o diretório.
+DIRETORIO_DADOS = os.environ.get("CASINO_HOLDEM_DADOS") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".dados")
+MAGIA = b"CHTB"
+CABECALHO = struct.Struct("<4sII")
+CABECALHO_ARRAY = struct.Struct("<c3xQ")
+
+def caminho_tabela(nome, versao):
+    return os.path.join(DIRETORIO_TABELAS, f"{nome}_v{versao}.bin")
+
+def caminho_dados(nome):
+    return os.path.join(DIRETORIO_DADOS, nome)
+
+def _ler(caminho, versao):
+    with open(caminho, "rb") as arquivo:
+        magia, versao_arquivo, num_arrays = CABECALHO.unpack(arquivo.read(CABECALHO.size))
+        if magia != MAGIA or versao_arquivo != versao:
+            raise ValueError(f"Tabela inválida: {caminho}")
+        arrays = []
+        for _ in range(num_arrays):
+            typecode, tamanho = CABECALHO_ARRAY.unpack(arquivo.read(CABECALHO_ARRAY.size))
+            dados = array.array(typecode.decode())
+            dados.frombytes(arquivo.read(tamanho * dados.itemsize))
+            if len(dados) != tamanho:
+                raise ValueError(f"Tabela truncada: {caminho}")
+            if sys.byteorder == "big":
+                dados.byteswap()
+            arrays.append(dados)
+    return arrays
+
+def _gravar(caminho, versao, arrays):
+    # Grava num temporário e renomeia: processos que constroem a mesma tabela ao
+    # mesmo tempo nunca deixam um arquivo pela metade
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGIA, versao, len(arrays)))
+        for dados in arrays:
+            arquivo.write(CABECALHO_ARRAY.pack(dados.typecode.encode(), len(dados)))
+            if sys.byteorder == "big":
+                dados = array.array(dados.typecode, dados)
+                dados.byteswap()
+            arquivo.write(dados.tobytes())
+    os.replace(temporario, caminho)
+
+def carregar_tabela(nome, versao, construir):
+    # construir() -> lista de array.array. Sem arquivo válido, constrói e tenta
+    # gravar; um diretório sem permissão de escrita só custa reconstruir da próxima vez
+    caminho = caminho_tabela(nome, versao)
+    try:
+        return _ler(caminho, versao)
+    except (OSError, ValueError, struct.error):
+        pass
+    arrays = construir()
+    try:
+        _gravar(caminho, versao, arrays)
+    except OSError:
+        pass
+    return arrays